@@ -1,12 +1,26 @@
 from docx import Document
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsmap, qn
 from docx.shared import RGBColor, Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
+from collections import OrderedDict
+import asyncio
+import hashlib
 import os
-from ollama_humanize import humanize_with_ollama
+import threading
+import zipfile
+from lxml import etree
+from ollama_humanize import (humanize_batch_async, humanize_with_ollama, humanize_with_ollama_async,
+                             humanize_with_ollama_streaming, make_async_client)
+
+# Humanized paragraphs keyed by content hash; module-level so it outlives Streamlit reruns
+HUMANIZE_CACHE_SIZE = 1000
+_humanize_cache = OrderedDict()
+_humanize_cache_lock = threading.Lock()
 
 
 def process_docx(input_path, ollama_model="cogito-2.1:671b-cloud", ollama_url="http://localhost:11434", 
-                 temperature=0.7, max_tokens=2000, preserve_formatting=True):
+                 temperature=0.7, max_tokens=2000, preserve_formatting=True, min_chars=20):
     """
     Reads a docx file, humanizes the text using Ollama while preserving formatting,
     and saves to a new file with '_edited' suffix.
@@ -17,6 +31,7 @@ def process_docx(input_path, ollama_model="cogito-2.1:671b-cloud", ollama_url="h
     :param temperature: controls randomness (0.0-1.0)
     :param max_tokens: maximum number of tokens per request
     :param preserve_formatting: whether to preserve text formatting
+    :param min_chars: paragraphs shorter than this, or mostly non-letters, are kept as-is (default: 20)
     :return: path to the output file
     """
     
@@ -38,11 +53,12 @@ def process_docx(input_path, ollama_model="cogito-2.1:671b-cloud", ollama_url="h
     # Load the document
     doc = Document(input_path)
     
-    # Process each paragraph
-    total_paragraphs = len(doc.paragraphs)
-    for i, paragraph in enumerate(doc.paragraphs):
-        # Skip empty paragraphs
-        if not paragraph.text.strip():
+    # Process each paragraph (doc.paragraphs rebuilds its list on every access)
+    all_paragraphs = doc.paragraphs
+    total_paragraphs = len(all_paragraphs)
+    for i, paragraph in enumerate(all_paragraphs):
+        # Skip empty paragraphs and ones too short to be worth a model call
+        if not needs_humanizing(paragraph.text, min_chars):
             continue
         
         print(f"Processing paragraph {i + 1}/{total_paragraphs}...")
@@ -59,57 +75,9 @@ def process_docx(input_path, ollama_model="cogito-2.1:671b-cloud", ollama_url="h
                 max_tokens=max_tokens
             )
             
-            if preserve_formatting:
-                # Store original formatting for each run
-                run_formats = []
-                for run in paragraph.runs:
-                    run_formats.append({
-                        'bold': run.bold,
-                        'italic': run.italic,
-                        'underline': run.underline,
-                        'font_name': run.font.name,
-                        'font_size': run.font.size,
-                        'font_color': run.font.color.rgb if run.font.color.rgb else None
-                    })
-                
-                # Store paragraph formatting
-                paragraph_format = {
-                    'alignment': paragraph.alignment,
-                    'left_indent': paragraph.paragraph_format.left_indent,
-                    'right_indent': paragraph.paragraph_format.right_indent,
-                    'first_line_indent': paragraph.paragraph_format.first_line_indent,
-                    'space_before': paragraph.paragraph_format.space_before,
-                    'space_after': paragraph.paragraph_format.space_after,
-                    'line_spacing': paragraph.paragraph_format.line_spacing
-                }
-                
-                # Clear all runs in the paragraph
-                for run in paragraph.runs:
-                    run.text = ''
-                
-                # Add the humanized text to the first run (or create new one)
-                if paragraph.runs:
-                    paragraph.runs[0].text = humanized_text
-                    # Apply the first run's original formatting
-                    if run_formats:
-                        apply_run_format(paragraph.runs[0], run_formats[0])
-                else:
-                    run = paragraph.add_run(humanized_text)
-                    if run_formats:
-                        apply_run_format(run, run_formats[0])
-                
-                # Restore paragraph formatting
-                paragraph.alignment = paragraph_format['alignment']
-                paragraph.paragraph_format.left_indent = paragraph_format['left_indent']
-                paragraph.paragraph_format.right_indent = paragraph_format['right_indent']
-                paragraph.paragraph_format.first_line_indent = paragraph_format['first_line_indent']
-                paragraph.paragraph_format.space_before = paragraph_format['space_before']
-                paragraph.paragraph_format.space_after = paragraph_format['space_after']
-                paragraph.paragraph_format.line_spacing = paragraph_format['line_spacing']
-            else:
-                # Simple replacement without preserving formatting
-                paragraph.text = humanized_text
-                
+            formatting_data = capture_formatting(paragraph) if preserve_formatting else None
+            apply_humanized_text(paragraph, humanized_text, formatting_data)
+            
         except Exception as e:
             print(f"Warning: Could not process paragraph {i + 1}: {str(e)}")
             print("Keeping original text for this paragraph.")
@@ -120,7 +88,7 @@ def process_docx(input_path, ollama_model="cogito-2.1:671b-cloud", ollama_url="h
         for row in table.rows:
             for cell in row.cells:
                 for paragraph in cell.paragraphs:
-                    if not paragraph.text.strip():
+                    if not needs_humanizing(paragraph.text, min_chars):
                         continue
                     
                     original_text = paragraph.text
@@ -134,25 +102,9 @@ def process_docx(input_path, ollama_model="cogito-2.1:671b-cloud", ollama_url="h
                             max_tokens=max_tokens
                         )
                         
-                        if preserve_formatting and paragraph.runs:
-                            # Store formatting of first run
-                            run_format = {
-                                'bold': paragraph.runs[0].bold,
-                                'italic': paragraph.runs[0].italic,
-                                'underline': paragraph.runs[0].underline,
-                                'font_name': paragraph.runs[0].font.name,
-                                'font_size': paragraph.runs[0].font.size,
-                                'font_color': paragraph.runs[0].font.color.rgb if paragraph.runs[0].font.color.rgb else None
-                            }
-                            
-                            # Clear and replace
-                            for run in paragraph.runs:
-                                run.text = ''
-                            paragraph.runs[0].text = humanized_text
-                            apply_run_format(paragraph.runs[0], run_format)
-                        else:
-                            paragraph.text = humanized_text
-                            
+                        formatting_data = capture_formatting(paragraph) if preserve_formatting else None
+                        apply_humanized_text(paragraph, humanized_text, formatting_data)
+                        
                     except Exception as e:
                         print(f"Warning: Could not process table cell: {str(e)}")
                         continue
@@ -186,9 +138,137 @@ def apply_run_format(run, format_dict):
         run.font.color.rgb = format_dict['font_color']
 
 
+def _on_off(rPr, tag):
+    """Read a <w:rPr> toggle such as bold or italic: None if unset, else True/False"""
+    element = rPr.find(qn(tag))
+    if element is None:
+        return None
+    value = element.get(qn('w:val'))
+    return value is None or value in ('1', 'true', 'on')
+
+
+def read_run_format(run):
+    """
+    Read a run's direct formatting from its <w:rPr> element in one pass, instead of
+    going through python-docx's per-attribute descriptors.
+    
+    :param run: the run to inspect
+    :return: dictionary containing formatting info, as used by apply_run_format
+    """
+    rPr = run._r.find(qn('w:rPr'))
+    if rPr is None:
+        return {'bold': None, 'italic': None, 'underline': None,
+                'font_name': None, 'font_size': None, 'font_color': None}
+    
+    underline = rPr.find(qn('w:u'))
+    if underline is not None:
+        value = underline.get(qn('w:val'))
+        # Only single/none map to plain booleans; let python-docx decode the other styles
+        underline = True if value == 'single' else False if value == 'none' else run.underline
+    
+    fonts = rPr.find(qn('w:rFonts'))
+    
+    size = rPr.find(qn('w:sz'))
+    if size is not None:
+        try:
+            size = Pt(int(size.get(qn('w:val'))) / 2.0)
+        except (TypeError, ValueError):
+            size = run.font.size
+    
+    color = rPr.find(qn('w:color'))
+    if color is not None:
+        value = color.get(qn('w:val'))
+        try:
+            color = RGBColor.from_string(value) if value and value != 'auto' else None
+        except ValueError:
+            color = None
+    
+    return {
+        'bold': _on_off(rPr, 'w:b'),
+        'italic': _on_off(rPr, 'w:i'),
+        'underline': underline,
+        'font_name': fonts.get(qn('w:ascii')) if fonts is not None else None,
+        'font_size': size,
+        'font_color': color
+    }
+
+
+def capture_formatting(paragraph):
+    """
+    Capture run and paragraph formatting so it can be restored after rewriting.
+    
+    :param paragraph: the paragraph to inspect
+    :return: dict with 'run_formats' and 'paragraph_format' entries
+    """
+    runs = paragraph.runs
+    
+    run_formats = [read_run_format(run) for run in runs]
+    
+    # Zero or one plain run has nothing worth restoring
+    if len(runs) <= 1 and not any(f['bold'] or f['italic'] or f['underline'] for f in run_formats):
+        run_formats = []
+    
+    # Without a <w:pPr> element every paragraph format attribute is inherited
+    paragraph_format = None
+    if paragraph._p.pPr is not None:
+        paragraph_format = {
+            'alignment': paragraph.alignment,
+            'left_indent': paragraph.paragraph_format.left_indent,
+            'right_indent': paragraph.paragraph_format.right_indent,
+            'first_line_indent': paragraph.paragraph_format.first_line_indent,
+            'space_before': paragraph.paragraph_format.space_before,
+            'space_after': paragraph.paragraph_format.space_after,
+            'line_spacing': paragraph.paragraph_format.line_spacing
+        }
+    
+    return {
+        'run_formats': run_formats,
+        'paragraph_format': paragraph_format
+    }
+
+
+def apply_humanized_text(paragraph, humanized_text, formatting_data=None):
+    """
+    Write humanized text into a paragraph, restoring captured formatting if given.
+    
+    :param paragraph: the paragraph to update
+    :param humanized_text: the rewritten text
+    :param formatting_data: result of capture_formatting, or None for plain replacement
+    """
+    if not formatting_data:
+        paragraph.text = humanized_text
+        return
+    
+    # Clear all runs
+    for run in paragraph.runs:
+        run.text = ''
+    
+    # Add humanized text to first run or create new one
+    if paragraph.runs:
+        paragraph.runs[0].text = humanized_text
+        if formatting_data['run_formats']:
+            apply_run_format(paragraph.runs[0], formatting_data['run_formats'][0])
+    else:
+        run = paragraph.add_run(humanized_text)
+        if formatting_data['run_formats']:
+            apply_run_format(run, formatting_data['run_formats'][0])
+    
+    # Restore paragraph formatting
+    pf = formatting_data['paragraph_format']
+    if pf is None:
+        return
+    paragraph.alignment = pf['alignment']
+    paragraph.paragraph_format.left_indent = pf['left_indent']
+    paragraph.paragraph_format.right_indent = pf['right_indent']
+    paragraph.paragraph_format.first_line_indent = pf['first_line_indent']
+    paragraph.paragraph_format.space_before = pf['space_before']
+    paragraph.paragraph_format.space_after = pf['space_after']
+    paragraph.paragraph_format.line_spacing = pf['line_spacing']
+
+
 def batch_process_docx(directory, file_pattern="*.docx", ollama_model="cogito-2.1:671b-cloud", 
                        ollama_url="http://localhost:11434", temperature=0.7, 
-                       max_tokens=2000, preserve_formatting=True):
+                       max_tokens=2000, preserve_formatting=True, min_chars=20):
     """
     Processes multiple docx files in a directory.
     
@@ -199,6 +279,7 @@ def batch_process_docx(directory, file_pattern="*.docx", ollama_model="cogito-2.
     :param temperature: controls randomness
     :param max_tokens: maximum tokens per request
     :param preserve_formatting: whether to preserve formatting
+    :param min_chars: paragraphs shorter than this, or mostly non-letters, are kept as-is (default: 20)
     :return: list of output file paths
     """
     import glob
@@ -208,7 +289,7 @@ def batch_process_docx(directory, file_pattern="*.docx", ollama_model="cogito-2.
     
     # Find all matching docx files (excluding _edited files)
     pattern = os.path.join(directory, file_pattern)
-    files = [f for f in glob.glob(pattern) if not f.endswith('_edited.docx')]
+    files = [f for f in glob.iglob(pattern) if not f.endswith('_edited.docx')]
     
     if not files:
         print(f"No docx files found in {directory}")
@@ -228,7 +309,8 @@ def batch_process_docx(directory, file_pattern="*.docx", ollama_model="cogito-2.
                 ollama_url=ollama_url,
                 temperature=temperature,
                 max_tokens=max_tokens,
-                preserve_formatting=preserve_formatting
+                preserve_formatting=preserve_formatting,
+                min_chars=min_chars
             )
             output_files.append(output_file)
         except Exception as e:
@@ -242,11 +324,143 @@ def batch_process_docx(directory, file_pattern="*.docx", ollama_model="cogito-2.
     return output_files
 
 
+def needs_humanizing(text, min_chars=20):
+    """
+    Cheap pre-filter for paragraphs that aren't worth a model call: page numbers,
+    lone punctuation, single-word headings, URLs, table-of-contents leaders, etc.
+    
+    :param text: the paragraph text
+    :param min_chars: minimum stripped length to send to Ollama (0 disables the filter)
+    :return: True if the paragraph should be humanized
+    """
+    s = text.strip()
+    if min_chars <= 0:
+        return bool(s)
+    return len(s) >= min_chars and sum(c.isalpha() for c in s) >= min_chars * 0.6 and ' ' in s
+
+
+def chunk_groups(groups, batch_size, max_tokens):
+    """
+    Pack paragraph groups into chunks of at most batch_size, keeping the combined
+    input under roughly half of max_tokens (estimated at 4 characters per token).
+    
+    :param groups: list of tuples whose second item is the paragraph text, e.g. (indices, text)
+    :param batch_size: maximum number of groups per chunk
+    :param max_tokens: maximum tokens per request
+    :return: list of chunks, each a list of groups
+    """
+    chunks = []
+    chunk = []
+    chunk_tokens = 0
+    for group in groups:
+        tokens = len(group[1]) // 4
+        if chunk and (len(chunk) >= batch_size or chunk_tokens + tokens >= max_tokens // 2):
+            chunks.append(chunk)
+            chunk = []
+            chunk_tokens = 0
+        chunk.append(group)
+        chunk_tokens += tokens
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+# Run content python-docx turns into text (w:t, tabs, breaks, ...), for a paragraph's own
+# runs and its hyperlinks' runs. str() of each element gives the same text as Paragraph.text.
+_RUN_TEXT = ('*[self::w:t or self::w:tab or self::w:ptab or self::w:br or self::w:cr '
+             'or self::w:noBreakHyphen]')
+PARAGRAPH_TEXT_XPATH = etree.XPath(
+    f'w:r/{_RUN_TEXT} | w:hyperlink/w:r/{_RUN_TEXT}',
+    namespaces={'w': nsmap['w']}
+)
+
+
+def _body_paragraph_texts(body):
+    """Text of each non-empty paragraph directly under a <w:body> parsed with the oxml parser"""
+    texts = []
+    for p in body.iterchildren(qn('w:p')):
+        text = ''.join([str(e) for e in PARAGRAPH_TEXT_XPATH(p)])
+        if text.strip():
+            texts.append(text)
+    return texts
+
+
+def docx_paragraph_texts(doc):
+    """
+    Text of each non-empty body paragraph, read with one compiled XPath per paragraph
+    instead of building python-docx Paragraph and Run wrappers.
+    
+    :param doc: a python-docx Document
+    :return: list of paragraph texts
+    """
+    return _body_paragraph_texts(doc.element.body)
+
+
+_OFFICE_DOCUMENT_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+
+
+def read_docx_paragraph_texts(source):
+    """
+    Same as docx_paragraph_texts, but reads only the main document part straight from
+    the .docx zip, without loading styles, numbering, headers and the rest of the
+    package the way Document() does. Meant for quick previews.
+    
+    :param source: path or binary file object of a .docx file
+    :return: list of paragraph texts
+    """
+    with zipfile.ZipFile(source) as package:
+        # The main part is almost always word/document.xml, but the package rels are authoritative
+        part_name = 'word/document.xml'
+        rels = etree.fromstring(package.read('_rels/.rels'))
+        for rel in rels:
+            if rel.get('Type') == _OFFICE_DOCUMENT_REL:
+                part_name = rel.get('Target').lstrip('/')
+                break
+        root = parse_xml(package.read(part_name))
+    return _body_paragraph_texts(root.find(qn('w:body')))
+
+
+def _humanize_cache_key(text, model, temperature, max_tokens):
+    """
+    Content-addressed cache key for a paragraph and the settings that affect its output.
+    
+    :param text: the paragraph text
+    :param model: the Ollama model name
+    :param temperature: sampling temperature
+    :param max_tokens: maximum tokens per request
+    :return: hex digest identifying the request
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{model}\0{temperature}\0{max_tokens}\0".encode())
+    h.update(text.encode())
+    return h.hexdigest()
+
+
+def _humanize_cache_get(key):
+    """Return the cached humanized text for key (marking it recently used), or None"""
+    with _humanize_cache_lock:
+        humanized_text = _humanize_cache.get(key)
+        if humanized_text is not None:
+            _humanize_cache.move_to_end(key)
+        return humanized_text
+
+
+def _humanize_cache_put(key, humanized_text):
+    """Store humanized text under key, evicting the least recently used entry when full"""
+    with _humanize_cache_lock:
+        _humanize_cache[key] = humanized_text
+        _humanize_cache.move_to_end(key)
+        if len(_humanize_cache) > HUMANIZE_CACHE_SIZE:
+            _humanize_cache.popitem(last=False)
+
+
 def process_docx_with_progress(input_path, ollama_model="cogito-2.1:671b-cloud", ollama_url="http://localhost:11434",
                                temperature=0.7, max_tokens=2000, preserve_formatting=True,
-                               progress_callback=None):
+                               progress_callback=None, stream_callback=None, min_chars=20, keep_alive=None,
+                               return_text=False):
     """
-    Same as process_docx but with progress callback support.
+    Same as process_docx but with progress callback support. Paragraphs seen before with
+    the same settings are served from a content-hash cache instead of calling Ollama.
     
     :param input_path: path to the input docx file
     :param ollama_model: the Ollama model to use (default: cogito-2.1:671b-cloud)
@@ -255,7 +469,12 @@ def process_docx_with_progress(input_path, ollama_model="cogito-2.1:671b-cloud",
     :param max_tokens: maximum tokens per request
     :param preserve_formatting: whether to preserve formatting
     :param progress_callback: callback function(current, total, message)
-    :return: path to the output file
+    :param stream_callback: optional callback function(chunk) that receives each generated
+                            chunk of text; when given, paragraphs are humanized with streaming
+    :param min_chars: paragraphs shorter than this, or mostly non-letters, are kept as-is (default: 20)
+    :param keep_alive: how long Ollama keeps the model loaded between requests (None = server default)
+    :param return_text: also return the edited document's text, so callers needn't re-read the output
+    :return: path to the output file, or (path, text) if return_text is set
     """
     
     if not os.path.exists(input_path):
@@ -270,75 +489,53 @@ def process_docx_with_progress(input_path, ollama_model="cogito-2.1:671b-cloud",
     output_path = os.path.join(directory, f"{name}_edited{ext}")
     
     doc = Document(input_path)
-    total_paragraphs = len([p for p in doc.paragraphs if p.text.strip()])
+    paragraphs = [p for p in doc.paragraphs if p.text.strip()]
+    total_paragraphs = len(paragraphs)
     current = 0
     
     if progress_callback:
         progress_callback(0, total_paragraphs, "Starting processing...")
     
-    for i, paragraph in enumerate(doc.paragraphs):
-        if not paragraph.text.strip():
-            continue
-        
+    for paragraph in paragraphs:
         current += 1
         if progress_callback:
             progress_callback(current, total_paragraphs, f"Processing paragraph {current}/{total_paragraphs}")
         
         original_text = paragraph.text
+        if not needs_humanizing(original_text, min_chars):
+            continue
         
         try:
-            humanized_text = humanize_with_ollama(
-                original_text,
-                model=ollama_model,
-                ollama_url=ollama_url,
-                temperature=temperature,
-                max_tokens=max_tokens
-            )
-            
-            if preserve_formatting:
-                run_formats = []
-                for run in paragraph.runs:
-                    run_formats.append({
-                        'bold': run.bold,
-                        'italic': run.italic,
-                        'underline': run.underline,
-                        'font_name': run.font.name,
-                        'font_size': run.font.size,
-                        'font_color': run.font.color.rgb if run.font.color.rgb else None
-                    })
-                
-                paragraph_format = {
-                    'alignment': paragraph.alignment,
-                    'left_indent': paragraph.paragraph_format.left_indent,
-                    'right_indent': paragraph.paragraph_format.right_indent,
-                    'first_line_indent': paragraph.paragraph_format.first_line_indent,
-                    'space_before': paragraph.paragraph_format.space_before,
-                    'space_after': paragraph.paragraph_format.space_after,
-                    'line_spacing': paragraph.paragraph_format.line_spacing
-                }
-                
-                for run in paragraph.runs:
-                    run.text = ''
-                
-                if paragraph.runs:
-                    paragraph.runs[0].text = humanized_text
-                    if run_formats:
-                        apply_run_format(paragraph.runs[0], run_formats[0])
-                else:
-                    run = paragraph.add_run(humanized_text)
-                    if run_formats:
-                        apply_run_format(run, run_formats[0])
-                
-                paragraph.alignment = paragraph_format['alignment']
-                paragraph.paragraph_format.left_indent = paragraph_format['left_indent']
-                paragraph.paragraph_format.right_indent = paragraph_format['right_indent']
-                paragraph.paragraph_format.first_line_indent = paragraph_format['first_line_indent']
-                paragraph.paragraph_format.space_before = paragraph_format['space_before']
-                paragraph.paragraph_format.space_after = paragraph_format['space_after']
-                paragraph.paragraph_format.line_spacing = paragraph_format['line_spacing']
+            cache_key = _humanize_cache_key(original_text, ollama_model, temperature, max_tokens)
+            humanized_text = _humanize_cache_get(cache_key)
+            if humanized_text is not None:
+                if stream_callback:
+                    stream_callback(humanized_text)
+            elif stream_callback:
+                humanized_text = humanize_with_ollama_streaming(
+                    original_text,
+                    model=ollama_model,
+                    ollama_url=ollama_url,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    callback=stream_callback,
+                    keep_alive=keep_alive
+                )
+                _humanize_cache_put(cache_key, humanized_text)
             else:
-                paragraph.text = humanized_text
-                
+                humanized_text = humanize_with_ollama(
+                    original_text,
+                    model=ollama_model,
+                    ollama_url=ollama_url,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    keep_alive=keep_alive
+                )
+                _humanize_cache_put(cache_key, humanized_text)
+            
+            formatting_data = capture_formatting(paragraph) if preserve_formatting else None
+            apply_humanized_text(paragraph, humanized_text, formatting_data)
+            
         except Exception as e:
             if progress_callback:
                 progress_callback(current, total_paragraphs, f"Error in paragraph {current}: {str(e)}")
@@ -352,4 +549,155 @@ def process_docx_with_progress(input_path, ollama_model="cogito-2.1:671b-cloud",
     if progress_callback:
         progress_callback(total_paragraphs, total_paragraphs, "Done!")
     
-    return output_path
\ No newline at end of file
+    if return_text:
+        return output_path, '\n\n'.join(docx_paragraph_texts(doc))
+    return output_path
+
+
+async def process_docx_async_with_progress(input_path, ollama_model="cogito-2.1:671b-cloud",
+                                           ollama_url="http://localhost:11434", temperature=0.7,
+                                           max_tokens=2000, preserve_formatting=True,
+                                           progress_callback=None, max_concurrency=8, min_chars=20,
+                                           keep_alive=None, batch_size=1, return_text=False):
+    """
+    Same as process_docx_with_progress but keeps up to max_concurrency requests in
+    flight over one pooled httpx.AsyncClient, so Ollama can batch them server-side.
+    Each distinct paragraph text is sent at most once; cached texts are not sent at all.
+    With batch_size > 1, several paragraphs share one request and one prompt prefill.
+    
+    :param input_path: path to the input docx file
+    :param ollama_model: the Ollama model to use (default: cogito-2.1:671b-cloud)
+    :param ollama_url: the URL of the Ollama API
+    :param temperature: controls randomness
+    :param max_tokens: maximum tokens per request
+    :param preserve_formatting: whether to preserve formatting
+    :param progress_callback: callback function(current, total, message)
+    :param max_concurrency: maximum number of concurrent requests (default: 8)
+    :param min_chars: paragraphs shorter than this, or mostly non-letters, are kept as-is (default: 20)
+    :param keep_alive: how long Ollama keeps the model loaded between requests (None = server default)
+    :param batch_size: maximum number of paragraphs per request (default: 1)
+    :param return_text: also return the edited document's text, so callers needn't re-read the output
+    :return: path to the output file, or (path, text) if return_text is set
+    """
+    
+    if not os.path.exists(input_path):
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+    
+    if not input_path.endswith('.docx'):
+        raise ValueError("Input file must be a .docx file")
+    
+    directory = os.path.dirname(input_path)
+    filename = os.path.basename(input_path)
+    name, ext = os.path.splitext(filename)
+    output_path = os.path.join(directory, f"{name}_edited{ext}")
+    
+    doc = Document(input_path)
+    paragraphs = [p for p in doc.paragraphs if p.text.strip()]
+    total_paragraphs = len(paragraphs)
+    
+    if progress_callback:
+        progress_callback(0, total_paragraphs, "Starting processing...")
+    
+    # Group paragraphs by cache key so duplicates share one request
+    pending = {}
+    skipped = 0
+    for paragraph in paragraphs:
+        text = paragraph.text
+        if not needs_humanizing(text, min_chars):
+            skipped += 1
+            continue
+        cache_key = _humanize_cache_key(text, ollama_model, temperature, max_tokens)
+        if cache_key not in pending:
+            pending[cache_key] = (text, [])
+        pending[cache_key][1].append(paragraph)
+    
+    current = skipped
+    
+    def apply_group(group, humanized_text):
+        nonlocal current
+        for paragraph in group:
+            current += 1
+            # A paragraph whose formatting can't be read keeps its original text
+            # rather than aborting the run and losing every finished request
+            try:
+                formatting_data = capture_formatting(paragraph) if preserve_formatting else None
+                apply_humanized_text(paragraph, humanized_text, formatting_data)
+            except Exception as e:
+                if progress_callback:
+                    progress_callback(current, total_paragraphs, f"Error in paragraph {current}: {str(e)}")
+                continue
+            if progress_callback:
+                progress_callback(current, total_paragraphs, f"Processed paragraph {current}/{total_paragraphs}")
+    
+    to_send = []
+    for cache_key, (text, group) in pending.items():
+        humanized_text = _humanize_cache_get(cache_key)
+        if humanized_text is not None:
+            apply_group(group, humanized_text)
+        else:
+            to_send.append((cache_key, text, group))
+    
+    if to_send:
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async with make_async_client(max_concurrency) as client:
+            async def humanize_one(cache_key, text, group):
+                try:
+                    humanized_text = await humanize_with_ollama_async(
+                        client,
+                        text,
+                        model=ollama_model,
+                        ollama_url=ollama_url,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        keep_alive=keep_alive
+                    )
+                    return cache_key, group, humanized_text, None
+                except Exception as e:
+                    return cache_key, group, None, e
+            
+            async def bounded(chunk):
+                async with semaphore:
+                    if len(chunk) == 1:
+                        return [await humanize_one(*chunk[0])]
+                    try:
+                        humanized_texts = await humanize_batch_async(
+                            client,
+                            [text for _, text, _ in chunk],
+                            model=ollama_model,
+                            ollama_url=ollama_url,
+                            temperature=temperature,
+                            max_tokens=max_tokens,
+                            keep_alive=keep_alive
+                        )
+                    except Exception:
+                        # The reply couldn't be split cleanly; send the paragraphs one by one
+                        return [await humanize_one(*item) for item in chunk]
+                    return [
+                        (cache_key, group, humanized_text, None)
+                        for (cache_key, _, group), humanized_text in zip(chunk, humanized_texts)
+                    ]
+            
+            chunks = chunk_groups(to_send, batch_size, max_tokens)
+            for next_done in asyncio.as_completed([bounded(chunk) for chunk in chunks]):
+                for cache_key, group, humanized_text, error in await next_done:
+                    if error is not None:
+                        current += len(group)
+                        if progress_callback:
+                            progress_callback(current, total_paragraphs, f"Error in paragraph {current}: {str(error)}")
+                        continue
+                    
+                    _humanize_cache_put(cache_key, humanized_text)
+                    apply_group(group, humanized_text)
+    
+    if progress_callback:
+        progress_callback(total_paragraphs, total_paragraphs, "Saving document...")
+    
+    doc.save(output_path)
+    
+    if progress_callback:
+        progress_callback(total_paragraphs, total_paragraphs, "Done!")
+    
+    if return_text:
+        return output_path, '\n\n'.join(docx_paragraph_texts(doc))
+    return output_path
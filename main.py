@@ -5,83 +5,173 @@ Main entry point with threading support for faster processing
 """
 
 import argparse
+import asyncio
+import atexit
+import functools
 import os
+import queue
 import sys
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Lock
+from threading import Thread
 from docx import Document
-from docx_processor import apply_run_format, process_docx, batch_process_docx
-from ollama_humanize import humanize_with_ollama
+from docx_processor import (apply_humanized_text, batch_process_docx, capture_formatting, chunk_groups,
+                            needs_humanizing, process_docx)
+from ollama_humanize import (humanize_batch, humanize_with_ollama_async, humanize_with_ollama_streaming,
+                             init_session, make_async_client, warm_up_model)
 
 
-# Thread-safe print lock
-print_lock = Lock()
+# Log messages are queued and written by a single background thread, so workers
+# never block on stdout or contend for a print lock
+log_queue = queue.Queue()
+LOG_FLUSH_EVERY = 50
+
+
+def _write_log(args, kwargs):
+    """Print one queued message, replacing characters the console can't encode (e.g. ✓)"""
+    try:
+        print(*args, **kwargs)
+    except UnicodeEncodeError:
+        encoding = getattr(kwargs.get('file', sys.stdout), 'encoding', None) or 'ascii'
+        print(*(str(arg).encode(encoding, 'replace').decode(encoding) for arg in args), **kwargs)
+
+
+def _log_writer():
+    """
+    Drain log_queue to stdout, flushing every LOG_FLUSH_EVERY messages or when idle.
+    A message that can't be written (e.g. stdout piped to a closed `head`) is dropped;
+    the thread must keep draining, or flush_log would wait on it forever.
+    """
+    pending = 0
+    for args, kwargs in iter(log_queue.get, None):
+        try:
+            _write_log(args, kwargs)
+            pending += 1
+            if pending >= LOG_FLUSH_EVERY or log_queue.empty():
+                sys.stdout.flush()
+                pending = 0
+        except Exception:
+            pass
+        finally:
+            log_queue.task_done()
+
+
+_log_thread = Thread(target=_log_writer, name="log-writer", daemon=True)
+_log_thread.start()
 
 
 def safe_print(*args, **kwargs):
     """Thread-safe print function"""
-    with print_lock:
-        print(*args, **kwargs)
+    log_queue.put((args, kwargs))
+
+
+def flush_log():
+    """Block until every queued log message has been written"""
+    # Nothing would ever drain the queue without the writer thread
+    if not _log_thread.is_alive():
+        return
+    log_queue.join()
+    sys.stdout.flush()
+
+
+atexit.register(flush_log)
+
+
+def _apply_with_format(paragraph, humanized_text):
+    """Replace a paragraph's text, keeping its first-run and paragraph formatting"""
+    apply_humanized_text(paragraph, humanized_text, capture_formatting(paragraph))
+
+
+def _apply_plain(paragraph, humanized_text):
+    """Replace a paragraph's text without preserving formatting"""
+    paragraph.text = humanized_text
+
+
+@functools.lru_cache(maxsize=4096)
+def _humanize_cached(text, ollama_model, ollama_url, temperature, max_tokens):
+    """
+    Memoized Ollama call so identical paragraphs, within a document or across a
+    batch, only cost one round-trip. Failures are not cached.
+    
+    Uses the streaming endpoint so tokens are parsed as they arrive and the
+    worker is released as soon as Ollama reports done.
+    """
+    return humanize_with_ollama_streaming(
+        text,
+        model=ollama_model,
+        ollama_url=ollama_url,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        callback=None
+    )
 
 
 def process_paragraph_threaded(paragraph_data):
     """
-    Process a single paragraph in a thread.
+    Humanize the text shared by a group of paragraphs in a thread.
     
-    :param paragraph_data: tuple of (index, paragraph, ollama_model, ollama_url, temperature, max_tokens, preserve_formatting)
-    :return: tuple of (index, success, humanized_text, formatting_data, error_message)
+    Workers only make the Ollama call; they never touch the document, so formatting
+    is captured and applied on the main thread and lxml is never shared across threads.
+    
+    :param paragraph_data: tuple of (indices, text, ollama_model, ollama_url, temperature, max_tokens)
+    :return: tuple of (indices, success, humanized_text, error_message)
     """
-    index, paragraph, ollama_model, ollama_url, temperature, max_tokens, preserve_formatting = paragraph_data
+    indices, original_text, ollama_model, ollama_url, temperature, max_tokens = paragraph_data
     
-    original_text = paragraph.text
+    try:
+        humanized_text = _humanize_cached(original_text, ollama_model, ollama_url, temperature, max_tokens)
+        return (indices, True, humanized_text, None)
+        
+    except Exception as e:
+        return (indices, False, None, str(e))
+
+
+def process_chunk_threaded(chunk_data):
+    """
+    Process a chunk of paragraph groups in a thread with a single batched Ollama call.
+    Falls back to one call per group if the batched response can't be split cleanly.
+    
+    :param chunk_data: tuple of (groups, ollama_model, ollama_url, temperature, max_tokens)
+                       where groups is a list of (indices, text) for paragraphs sharing the same text
+    :return: list of (indices, success, humanized_text, error_message) tuples
+    """
+    groups, ollama_model, ollama_url, temperature, max_tokens = chunk_data
+    
+    single_calls = [
+        (indices, text, ollama_model, ollama_url, temperature, max_tokens)
+        for indices, text in groups
+    ]
+    if len(groups) == 1:
+        return [process_paragraph_threaded(single_calls[0])]
     
     try:
-        humanized_text = humanize_with_ollama(
-            original_text,
+        humanized_texts = humanize_batch(
+            [text for _, text in groups],
             model=ollama_model,
             ollama_url=ollama_url,
             temperature=temperature,
             max_tokens=max_tokens
         )
-        
-        formatting_data = None
-        if preserve_formatting:
-            # Store formatting information
-            run_formats = []
-            for run in paragraph.runs:
-                run_formats.append({
-                    'bold': run.bold,
-                    'italic': run.italic,
-                    'underline': run.underline,
-                    'font_name': run.font.name,
-                    'font_size': run.font.size,
-                    'font_color': run.font.color.rgb if run.font.color.rgb else None
-                })
-            
-            paragraph_format = {
-                'alignment': paragraph.alignment,
-                'left_indent': paragraph.paragraph_format.left_indent,
-                'right_indent': paragraph.paragraph_format.right_indent,
-                'first_line_indent': paragraph.paragraph_format.first_line_indent,
-                'space_before': paragraph.paragraph_format.space_before,
-                'space_after': paragraph.paragraph_format.space_after,
-                'line_spacing': paragraph.paragraph_format.line_spacing
-            }
-            
-            formatting_data = {
-                'run_formats': run_formats,
-                'paragraph_format': paragraph_format
-            }
-        
-        return (index, True, humanized_text, formatting_data, None)
-        
-    except Exception as e:
-        return (index, False, None, None, str(e))
+    except Exception:
+        return [process_paragraph_threaded(call) for call in single_calls]
+    
+    return [
+        (indices, True, humanized_text, None)
+        for (indices, _), humanized_text in zip(groups, humanized_texts)
+    ]
+
+
+def _format_key(key):
+    """Human-readable label for a body index or table-cell paragraph key"""
+    if isinstance(key, tuple):
+        _, table_i, row_i, cell_i, para_i = key
+        return f"table {table_i} row {row_i} cell {cell_i}"
+    return str(key)
 
 
 def process_docx_threaded(input_path, ollama_model="cogito-2.1:671b-cloud", 
                          ollama_url="http://localhost:11434", temperature=0.7, 
-                         max_tokens=2000, preserve_formatting=True, max_workers=4):
+                         max_tokens=2000, preserve_formatting=True, max_workers=4, batch_size=1,
+                         min_chars=20):
     """
     Process a docx file using multiple threads for parallel paragraph processing.
     
@@ -92,6 +182,8 @@ def process_docx_threaded(input_path, ollama_model="cogito-2.1:671b-cloud",
     :param max_tokens: maximum tokens per request
     :param preserve_formatting: whether to preserve formatting
     :param max_workers: number of threads to use (default: 4)
+    :param batch_size: maximum paragraphs packed into one Ollama request (default: 1, no batching)
+    :param min_chars: paragraphs shorter than this are kept as-is (default: 20, 0 sends everything)
     :return: path to the output file
     """
     
@@ -113,106 +205,204 @@ def process_docx_threaded(input_path, ollama_model="cogito-2.1:671b-cloud",
     # Load the document
     doc = Document(input_path)
     
-    # Collect all non-empty paragraphs
-    paragraphs_to_process = []
-    paragraph_indices = []
+    # Collect body and table-cell paragraphs worth humanizing, keyed by their position, and
+    # group identical text so each is sent only once. Each paragraph's text is read once.
+    # Body paragraphs use their index; table paragraphs use ("table", table, row, cell, paragraph).
+    targets = {}
+    unique = {}
+    skipped = 0
+    
+    def collect(key, paragraph):
+        nonlocal skipped
+        text = paragraph.text.strip()
+        if not text:
+            return
+        if not needs_humanizing(text, min_chars):
+            # Keep the original text; not worth a model call
+            skipped += 1
+            return
+        targets[key] = paragraph
+        unique.setdefault(text, []).append(key)
     
     for i, paragraph in enumerate(doc.paragraphs):
-        if paragraph.text.strip():
-            paragraphs_to_process.append((
-                i, paragraph, ollama_model, ollama_url, 
-                temperature, max_tokens, preserve_formatting
-            ))
-            paragraph_indices.append(i)
-    
-    total_paragraphs = len(paragraphs_to_process)
-    safe_print(f"Processing {total_paragraphs} paragraphs using {max_workers} threads...")
-    
-    # Process paragraphs in parallel
-    results = {}
+        collect(i, paragraph)
+    for table_i, table in enumerate(doc.tables):
+        for row_i, row in enumerate(table.rows):
+            for cell_i, cell in enumerate(row.cells):
+                for para_i, paragraph in enumerate(cell.paragraphs):
+                    collect(("table", table_i, row_i, cell_i, para_i), paragraph)
+    
+    # Longest paragraphs first: the executor dispatches in submission order, so the slow
+    # tail goes in flight early and short paragraphs fill the remaining threads around it
+    groups = [(unique[text], text) for text in sorted(unique, key=len, reverse=True)]
+    paragraphs_to_process = [
+        (chunk, ollama_model, ollama_url, temperature, max_tokens)
+        for chunk in chunk_groups(groups, batch_size, max_tokens)
+    ]
+    
+    total_paragraphs = len(targets)
+    if skipped:
+        safe_print(f"Skipping {skipped} short or non-prose paragraphs")
+    
+    # Nothing to send: skip the session and thread pool entirely
+    if not paragraphs_to_process:
+        safe_print("No paragraphs to process")
+        safe_print(f"Saving edited document: {output_path}")
+        doc.save(output_path)
+        return output_path
+    
+    safe_print(f"Processing {total_paragraphs} paragraphs ({len(unique)} unique, "
+               f"{len(paragraphs_to_process)} requests) using {max_workers} threads...")
+    
+    # Give every worker thread its own pooled keep-alive connection, and never more
+    init_session(max_workers, pool_block=True)
+    
+    # Load the model once here rather than having every worker wait on the cold start
+    warm_up_model(ollama_model, ollama_url)
+    
+    # Process paragraphs in parallel, applying each result as soon as it arrives
+    apply_result = _apply_with_format if preserve_formatting else _apply_plain
+    success_count = 0
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         # Submit all tasks
         future_to_index = {
-            executor.submit(process_paragraph_threaded, para_data): para_data[0] 
+            executor.submit(process_chunk_threaded, para_data): para_data[0] 
             for para_data in paragraphs_to_process
         }
         
-        # Process completed tasks
+        # Process completed tasks, fanning each result out to every paragraph with that text
         completed = 0
         for future in as_completed(future_to_index):
-            index, success, humanized_text, formatting_data, error = future.result()
-            results[index] = (success, humanized_text, formatting_data, error)
-            
-            completed += 1
-            if success:
+            for indices, success, humanized_text, error in future.result():
+                completed += len(indices)
+                index = ', '.join(_format_key(key) for key in indices)
+                
+                if not success:
+                    safe_print(f"✗ Failed paragraph {completed}/{total_paragraphs} (index: {index}): {error}")
+                    safe_print(f"Warning: Keeping original text for paragraph {index}")
+                    continue
+                
+                # Apply the humanized text while other requests are still in flight. A paragraph
+                # that can't take the new text keeps its original instead of losing the document.
+                applied = 0
+                for key in indices:
+                    try:
+                        apply_result(targets[key], humanized_text)
+                        applied += 1
+                    except Exception as e:
+                        safe_print(f"✗ Could not apply paragraph {_format_key(key)}: {e}")
+                        safe_print(f"Warning: Keeping original text for paragraph {_format_key(key)}")
+                success_count += applied
+                if not applied:
+                    continue
+                
                 safe_print(f"✓ Processed paragraph {completed}/{total_paragraphs} (index: {index})")
-            else:
-                safe_print(f"✗ Failed paragraph {completed}/{total_paragraphs} (index: {index}): {error}")
     
-    # Apply results back to document in order
-    safe_print("Applying changes to document...")
-    success_count = 0
+    # Save the document
+    safe_print(f"Saving edited document: {output_path}")
+    doc.save(output_path)
+    safe_print(f"Done! Successfully processed {success_count}/{total_paragraphs} paragraphs.")
     
-    for i, paragraph in enumerate(doc.paragraphs):
-        if i not in results:
-            continue
-        
-        success, humanized_text, formatting_data, error = results[i]
-        
-        if not success:
-            safe_print(f"Warning: Keeping original text for paragraph {i}: {error}")
-            continue
-        
-        # Apply the humanized text
-        if preserve_formatting and formatting_data:
-            # Clear all runs
-            for run in paragraph.runs:
-                run.text = ''
-            
-            # Add humanized text to first run or create new one
-            if paragraph.runs:
-                paragraph.runs[0].text = humanized_text
-                if formatting_data['run_formats']:
-                    apply_run_format(paragraph.runs[0], formatting_data['run_formats'][0])
-            else:
-                run = paragraph.add_run(humanized_text)
-                if formatting_data['run_formats']:
-                    apply_run_format(run, formatting_data['run_formats'][0])
-            
-            # Restore paragraph formatting
-            pf = formatting_data['paragraph_format']
-            paragraph.alignment = pf['alignment']
-            paragraph.paragraph_format.left_indent = pf['left_indent']
-            paragraph.paragraph_format.right_indent = pf['right_indent']
-            paragraph.paragraph_format.first_line_indent = pf['first_line_indent']
-            paragraph.paragraph_format.space_before = pf['space_before']
-            paragraph.paragraph_format.space_after = pf['space_after']
-            paragraph.paragraph_format.line_spacing = pf['line_spacing']
-        else:
-            paragraph.text = humanized_text
-        
-        success_count += 1
+    return output_path
+
+
+async def process_docx_async(input_path, ollama_model="cogito-2.1:671b-cloud",
+                             ollama_url="http://localhost:11434", temperature=0.7,
+                             max_tokens=2000, preserve_formatting=True, max_workers=4, min_chars=20):
+    """
+    Process a docx file with asyncio, keeping up to max_workers requests in flight
+    over a single pooled httpx.AsyncClient instead of one thread per request.
+    
+    :param input_path: path to the input docx file
+    :param ollama_model: the Ollama model to use
+    :param ollama_url: the URL of the Ollama API
+    :param temperature: controls randomness
+    :param max_tokens: maximum tokens per request
+    :param preserve_formatting: whether to preserve formatting
+    :param max_workers: maximum number of concurrent requests (default: 4)
+    :param min_chars: paragraphs shorter than this are kept as-is (default: 20, 0 sends everything)
+    :return: path to the output file
+    """
+    
+    # Validate input file
+    if not os.path.exists(input_path):
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+    
+    if not input_path.endswith('.docx'):
+        raise ValueError("Input file must be a .docx file")
+    
+    # Generate output path
+    directory = os.path.dirname(input_path) or '.'
+    filename = os.path.basename(input_path)
+    name, ext = os.path.splitext(filename)
+    output_path = os.path.join(directory, f"{name}_edited{ext}")
     
-    # Process tables (sequential for simplicity - tables are usually smaller)
-    safe_print("Processing tables...")
+    safe_print(f"Reading document: {input_path}")
+    
+    # Load the document
+    doc = Document(input_path)
+    
+    # Collect all paragraphs worth humanizing, including those inside table cells
+    paragraphs = [p for p in doc.paragraphs if needs_humanizing(p.text, min_chars)]
     for table in doc.tables:
         for row in table.rows:
             for cell in row.cells:
-                for paragraph in cell.paragraphs:
-                    if not paragraph.text.strip():
-                        continue
-                    
-                    try:
-                        humanized_text = humanize_with_ollama(
-                            paragraph.text,
-                            model=ollama_model,
-                            ollama_url=ollama_url,
-                            temperature=temperature,
-                            max_tokens=max_tokens
-                        )
-                        paragraph.text = humanized_text
-                    except Exception as e:
-                        safe_print(f"Warning: Could not process table cell: {str(e)}")
+                paragraphs.extend(p for p in cell.paragraphs if needs_humanizing(p.text, min_chars))
+    
+    total_paragraphs = len(paragraphs)
+    
+    # Nothing to send: skip opening the HTTP client
+    if not paragraphs:
+        safe_print("No paragraphs to process")
+        safe_print(f"Saving edited document: {output_path}")
+        doc.save(output_path)
+        return output_path
+    
+    safe_print(f"Processing {total_paragraphs} paragraphs with {max_workers} concurrent requests...")
+    
+    # Load the model once here rather than having every request wait on the cold start
+    warm_up_model(ollama_model, ollama_url)
+    
+    semaphore = asyncio.Semaphore(max_workers)
+    
+    async with make_async_client(max_workers) as client:
+        async def bounded(index, paragraph):
+            async with semaphore:
+                try:
+                    humanized_text = await humanize_with_ollama_async(
+                        client,
+                        paragraph.text,
+                        model=ollama_model,
+                        ollama_url=ollama_url,
+                        temperature=temperature,
+                        max_tokens=max_tokens
+                    )
+                    return (index, True, humanized_text, None)
+                except Exception as e:
+                    return (index, False, None, str(e))
+        
+        # Apply each result as soon as it arrives, while other requests are still in flight
+        apply_result = _apply_with_format if preserve_formatting else _apply_plain
+        success_count = 0
+        completed = 0
+        for next_done in asyncio.as_completed([bounded(i, p) for i, p in enumerate(paragraphs)]):
+            index, success, humanized_text, error = await next_done
+            
+            completed += 1
+            if not success:
+                safe_print(f"✗ Failed paragraph {completed}/{total_paragraphs} (index: {index}): {error}")
+                safe_print(f"Warning: Keeping original text for paragraph {index}")
+                continue
+            
+            try:
+                apply_result(paragraphs[index], humanized_text)
+            except Exception as e:
+                safe_print(f"✗ Could not apply paragraph {completed}/{total_paragraphs} (index: {index}): {e}")
+                safe_print(f"Warning: Keeping original text for paragraph {index}")
+                continue
+            success_count += 1
+            
+            safe_print(f"✓ Processed paragraph {completed}/{total_paragraphs} (index: {index})")
     
     # Save the document
     safe_print(f"Saving edited document: {output_path}")
@@ -224,7 +414,8 @@ def process_docx_threaded(input_path, ollama_model="cogito-2.1:671b-cloud",
 
 def batch_process_threaded(directory, file_pattern="*.docx", ollama_model="cogito-2.1:671b-cloud",
                            ollama_url="http://localhost:11434", temperature=0.7,
-                           max_tokens=2000, preserve_formatting=True, max_workers=4):
+                           max_tokens=2000, preserve_formatting=True, max_workers=4, use_async=False,
+                           batch_size=1, min_chars=20, file_workers=1):
     """
     Process multiple docx files with threading.
     
@@ -235,7 +426,11 @@ def batch_process_threaded(directory, file_pattern="*.docx", ollama_model="cogit
     :param temperature: controls randomness
     :param max_tokens: maximum tokens per request
     :param preserve_formatting: whether to preserve formatting
-    :param max_workers: number of threads per file
+    :param max_workers: total number of threads, split evenly across files processed at once
+    :param use_async: use the asyncio pipeline instead of a thread pool for each file
+    :param batch_size: maximum paragraphs packed into one Ollama request (threaded mode only)
+    :param min_chars: paragraphs shorter than this are kept as-is (0 sends everything)
+    :param file_workers: number of files processed concurrently (default: 1)
     :return: list of output file paths
     """
     import glob
@@ -244,33 +439,58 @@ def batch_process_threaded(directory, file_pattern="*.docx", ollama_model="cogit
         raise FileNotFoundError(f"Directory not found: {directory}")
     
     pattern = os.path.join(directory, file_pattern)
-    files = [f for f in glob.glob(pattern) if not f.endswith('_edited.docx')]
+    files = [f for f in glob.iglob(pattern) if not f.endswith('_edited.docx')]
     
     if not files:
         safe_print(f"No docx files found in {directory}")
         return []
     
-    output_files = []
+    # Split the thread budget between files processed side by side
+    file_workers = max(1, min(file_workers, len(files)))
+    per_file_workers = max(1, max_workers // file_workers)
+    if file_workers > 1:
+        safe_print(f"Processing {file_workers} files at a time with {per_file_workers} threads each")
+    init_session(per_file_workers * file_workers, pool_block=True)
     
-    for i, input_file in enumerate(files):
+    def process_one(i, input_file):
         safe_print(f"\n{'=' * 80}")
         safe_print(f"Processing file {i + 1}/{len(files)}: {os.path.basename(input_file)}")
         safe_print('=' * 80)
         
         try:
-            output_file = process_docx_threaded(
-                input_file,
-                ollama_model=ollama_model,
-                ollama_url=ollama_url,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                preserve_formatting=preserve_formatting,
-                max_workers=max_workers
-            )
-            output_files.append(output_file)
+            if use_async:
+                return asyncio.run(process_docx_async(
+                    input_file,
+                    ollama_model=ollama_model,
+                    ollama_url=ollama_url,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    preserve_formatting=preserve_formatting,
+                    max_workers=per_file_workers,
+                    min_chars=min_chars
+                ))
+            else:
+                return process_docx_threaded(
+                    input_file,
+                    ollama_model=ollama_model,
+                    ollama_url=ollama_url,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    preserve_formatting=preserve_formatting,
+                    max_workers=per_file_workers,
+                    batch_size=batch_size,
+                    min_chars=min_chars
+                )
         except Exception as e:
             safe_print(f"Error processing {input_file}: {str(e)}")
-            continue
+            return None
+    
+    with ThreadPoolExecutor(max_workers=file_workers) as file_executor:
+        output_files = [
+            output_file
+            for output_file in file_executor.map(process_one, range(len(files)), files)
+            if output_file
+        ]
     
     safe_print(f"\n{'=' * 80}")
     safe_print(f"Batch processing complete! Processed {len(output_files)}/{len(files)} files.")
@@ -295,6 +515,15 @@ Examples:
   # Batch process all docx files in a directory
   python main.py --batch-dir ./documents --threads 4
 
+  # Batch process two files at a time, 4 threads each
+  python main.py --batch-dir ./documents --threads 8 --file-workers 2
+
+  # Pack up to 8 short paragraphs into each Ollama request
+  python main.py --input document.docx --batch-size 8
+
+  # Use the asyncio pipeline (requires httpx) with 16 concurrent requests
+  python main.py --input document.docx --async --threads 16
+
   # Custom output path and style
   python main.py --input doc.docx --output humanized.docx --temperature 0.9
         """
@@ -325,6 +554,14 @@ Examples:
                        help='Do not preserve document formatting')
     parser.add_argument('--no-threading', action='store_true',
                        help='Use sequential processing instead of threading')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                       help='Use asyncio + httpx instead of a thread pool (--threads sets the concurrency)')
+    parser.add_argument('--batch-size', type=int, default=1,
+                       help='Paragraphs packed into one Ollama request in threaded mode (default: 1)')
+    parser.add_argument('--file-workers', type=int, default=1,
+                       help='Files processed at the same time in batch mode; --threads is split between them (default: 1)')
+    parser.add_argument('--min-chars', type=int, default=20,
+                       help='Keep paragraphs shorter than this unchanged, 0 to send everything (default: 20)')
     
     args = parser.parse_args()
     
@@ -340,8 +577,20 @@ Examples:
                     ollama_url=args.url,
                     temperature=args.temperature,
                     max_tokens=args.max_tokens,
-                    preserve_formatting=preserve_formatting
+                    preserve_formatting=preserve_formatting,
+                    min_chars=args.min_chars
                 )
+            elif args.use_async:
+                output_path = asyncio.run(process_docx_async(
+                    args.input,
+                    ollama_model=args.model,
+                    ollama_url=args.url,
+                    temperature=args.temperature,
+                    max_tokens=args.max_tokens,
+                    preserve_formatting=preserve_formatting,
+                    max_workers=args.threads,
+                    min_chars=args.min_chars
+                ))
             else:
                 output_path = process_docx_threaded(
                     args.input,
@@ -350,14 +599,16 @@ Examples:
                     temperature=args.temperature,
                     max_tokens=args.max_tokens,
                     preserve_formatting=preserve_formatting,
-                    max_workers=args.threads
+                    max_workers=args.threads,
+                    batch_size=args.batch_size,
+                    min_chars=args.min_chars
                 )
             
             # Handle custom output path
             if args.output and output_path != args.output:
                 import shutil
                 shutil.move(output_path, args.output)
-                print(f"Moved output to: {args.output}")
+                safe_print(f"Moved output to: {args.output}")
         
         else:
             # Batch mode
@@ -368,7 +619,8 @@ Examples:
                     ollama_url=args.url,
                     temperature=args.temperature,
                     max_tokens=args.max_tokens,
-                    preserve_formatting=preserve_formatting
+                    preserve_formatting=preserve_formatting,
+                    min_chars=args.min_chars
                 )
             else:
                 batch_process_threaded(
@@ -378,13 +630,19 @@ Examples:
                     temperature=args.temperature,
                     max_tokens=args.max_tokens,
                     preserve_formatting=preserve_formatting,
-                    max_workers=args.threads
+                    max_workers=args.threads,
+                    use_async=args.use_async,
+                    batch_size=args.batch_size,
+                    min_chars=args.min_chars,
+                    file_workers=args.file_workers
                 )
     
     except KeyboardInterrupt:
+        flush_log()
         print("\n\nProcess interrupted by user.")
         sys.exit(1)
     except Exception as e:
+        flush_log()
         print(f"\nError: {str(e)}", file=sys.stderr)
         sys.exit(1)
 
@@ -1,17 +1,92 @@
 import requests
 import json
 import os
+import re
+import functools
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+try:
+    import httpx
+except ImportError:  # optional, only needed for the asyncio pipeline
+    httpx = None
 
-def load_humanizer_prompt(prompt_file="humanizer.txt"):
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # optional, faster parsing of streamed chunks
+    _json_loads = json.loads
+
+
+# Shared HTTP session so every call to Ollama reuses pooled keep-alive connections
+_SESSION = requests.Session()
+_pool_config = None
+
+
+def _make_adapter(pool_connections=16, pool_maxsize=32, pool_block=False):
     """
-    Load the humanizer prompt from a text file.
+    Build an HTTPAdapter with connection pooling and retries on gateway errors.
+    Failed connects and 502/503/504 responses are retried, but a read timeout is
+    not: Ollama sends nothing until generation finishes, so re-sending the POST
+    would only repeat a slow generation, and the caller should see the timeout.
+    
+    :param pool_connections: number of host pools to cache
+    :param pool_maxsize: maximum number of connections kept per host
+    :param pool_block: wait for a free pooled connection instead of opening a throwaway one
+    :return: the configured adapter
+    """
+    retry = Retry(
+        total=2,
+        read=False,
+        backoff_factor=0.3,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=frozenset(["GET", "POST"]),
+        raise_on_status=False
+    )
+    return HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                       max_retries=retry, pool_block=pool_block)
+
+
+def init_session(pool_size=32, pool_block=False):
+    """
+    (Re)mount the shared session's adapters with a pool sized for the caller.
+    
+    Size the pool to the number of worker threads so each thread keeps its own
+    keep-alive connection; urllib3's default of 10 would evict and reconnect
+    once more than 10 threads are active.
+    
+    The pool is never shrunk while the blocking mode stays the same, so documents
+    processed side by side don't remount adapters under each other's requests.
+    
+    :param pool_size: maximum number of concurrent connections to Ollama
+    :param pool_block: make threads wait for a pooled connection rather than open extra ones
+    :return: the shared session
+    """
+    global _pool_config
+    pool_size = max(1, pool_size)
+    if _pool_config is not None and _pool_config[1] == pool_block and _pool_config[0] >= pool_size:
+        return _SESSION
+    _pool_config = (pool_size, pool_block)
+    adapter = _make_adapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=pool_block)
+    _SESSION.mount("http://", adapter)
+    _SESSION.mount("https://", adapter)
+    return _SESSION
+
+
+init_session()
+
+
+@functools.lru_cache(maxsize=8)
+def _read_prompt_cached(prompt_file, mtime):
+    """
+    Read the prompt file; cached per (path, mtime) so edits are picked up.
     
     :param prompt_file: path to the humanizer prompt file
+    :param mtime: modification time of the file, or None if it does not exist
     :return: the prompt text
     """
     # Try to load from file if it exists
-    if os.path.exists(prompt_file):
+    if mtime is not None:
         with open(prompt_file, 'r', encoding='utf-8') as f:
             return f.read().strip()
     
@@ -22,9 +97,99 @@ use more casual language where appropriate, and make it feel like a person wrote
 Do not add any preamble or explanation, just provide the rewritten text."""
 
 
+def load_humanizer_prompt(prompt_file="humanizer.txt"):
+    """
+    Load the humanizer prompt from a text file.
+    
+    :param prompt_file: path to the humanizer prompt file
+    :return: the prompt text
+    """
+    try:
+        mtime = os.path.getmtime(prompt_file)
+    except OSError:
+        mtime = None
+    return _read_prompt_cached(prompt_file, mtime)
+
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+@functools.lru_cache(maxsize=8)
+def _system_message_json(system_prompt):
+    """
+    Serialize the system message once per prompt; it's the bulk of every request body.
+    
+    :param system_prompt: the system prompt text
+    :return: the JSON-encoded system message
+    """
+    return json.dumps({"role": "system", "content": system_prompt})
+
+
+def _chat_body(model, system_prompt, user_content, stream, options, keep_alive=None):
+    """
+    Encode an /api/chat request body, splicing in the cached system message JSON.
+    
+    :param model: the Ollama model to use
+    :param system_prompt: the system prompt text
+    :param user_content: the user message content
+    :param stream: whether to ask Ollama for a streamed response
+    :param options: Ollama generation options
+    :param keep_alive: how long Ollama keeps the model loaded afterwards (-1 = forever, "5m", 0 = unload); None uses the server default
+    :return: the request body as bytes
+    """
+    return (
+        '{"model": ' + json.dumps(model)
+        + ', "messages": [' + _system_message_json(system_prompt)
+        + ', ' + json.dumps({"role": "user", "content": user_content})
+        + '], "stream": ' + json.dumps(stream)
+        + ', "options": ' + json.dumps(options)
+        + ('' if keep_alive is None else ', "keep_alive": ' + json.dumps(keep_alive)) + '}'
+    ).encode('utf-8')
+
+
+def _build_request(text, model, temperature, max_tokens, prompt_file, use_system_prompt, stream,
+                   keep_alive=None):
+    """
+    Build the Ollama endpoint path and encoded JSON body for a humanize request.
+    
+    :param text: the text to be humanized
+    :param model: the Ollama model to use
+    :param temperature: controls randomness
+    :param max_tokens: maximum number of tokens in the response
+    :param prompt_file: path to the humanizer prompt file
+    :param use_system_prompt: whether to use system/user message format
+    :param stream: whether to ask Ollama for a streamed response
+    :param keep_alive: how long Ollama keeps the model loaded afterwards (-1 = forever, "5m", 0 = unload); None uses the server default
+    :return: tuple of (endpoint, body)
+    """
+    # Load the system prompt
+    system_prompt = load_humanizer_prompt(prompt_file)
+    options = {
+        "temperature": temperature,
+        "num_predict": max_tokens
+    }
+    
+    if use_system_prompt:
+        # Use chat format with system and user messages (more reliable)
+        return "/api/chat", _chat_body(model, system_prompt, f"Rewrite this text:\n\n{text}", stream, options,
+                                       keep_alive)
+    
+    # Use generate format (fallback)
+    prompt = f"{system_prompt}\n\nText to rewrite:\n{text}\n\nRewritten text:"
+    payload = {
+        "model": model,
+        "prompt": prompt,
+        "stream": stream,
+        "options": options
+    }
+    if keep_alive is not None:
+        payload["keep_alive"] = keep_alive
+    return "/api/generate", json.dumps(payload).encode('utf-8')
+
+
 def humanize_with_ollama(text, model="cogito-2.1:671b-cloud", ollama_url="http://localhost:11434", 
                         temperature=0.7, max_tokens=2000, prompt_file="humanizer.txt",
-                        use_system_prompt=True):
+                        use_system_prompt=True, keep_alive=None):
     """
     Uses Ollama to humanize text by making it sound more natural and less AI-generated.
     
@@ -35,54 +200,15 @@ def humanize_with_ollama(text, model="cogito-2.1:671b-cloud", ollama_url="http:/
     :param max_tokens: maximum number of tokens in the response
     :param prompt_file: path to the humanizer prompt file
     :param use_system_prompt: whether to use system/user message format (better for chat models)
+    :param keep_alive: how long Ollama keeps the model loaded afterwards (-1 = forever, "5m", 0 = unload); None uses the server default
     :return: the humanized text
     """
     
-    # Load the system prompt
-    system_prompt = load_humanizer_prompt(prompt_file)
+    endpoint, body = _build_request(text, model, temperature, max_tokens, prompt_file,
+                                    use_system_prompt, stream=False, keep_alive=keep_alive)
     
     try:
-        if use_system_prompt:
-            # Use chat format with system and user messages (more reliable)
-            response = requests.post(
-                f"{ollama_url}/api/chat",
-                json={
-                    "model": model,
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": system_prompt
-                        },
-                        {
-                            "role": "user",
-                            "content": f"Rewrite this text:\n\n{text}"
-                        }
-                    ],
-                    "stream": False,
-                    "options": {
-                        "temperature": temperature,
-                        "num_predict": max_tokens
-                    }
-                },
-                timeout=120
-            )
-        else:
-            # Use generate format (fallback)
-            prompt = f"{system_prompt}\n\nText to rewrite:\n{text}\n\nRewritten text:"
-            
-            response = requests.post(
-                f"{ollama_url}/api/generate",
-                json={
-                    "model": model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": temperature,
-                        "num_predict": max_tokens
-                    }
-                },
-                timeout=120
-            )
+        response = _SESSION.post(f"{ollama_url}{endpoint}", data=body, headers=_JSON_HEADERS, timeout=120)
         
         if response.status_code == 200:
             result = response.json()
@@ -110,9 +236,42 @@ def humanize_with_ollama(text, model="cogito-2.1:671b-cloud", ollama_url="http:/
         raise Exception(f"Error calling Ollama: {str(e)}")
 
 
+def _extract_stream_chunk(line, content_key):
+    """
+    Pull the text and done flag out of one NDJSON stream line without parsing the
+    whole object. Ollama emits compact JSON with stable keys, so the text is the
+    string literal after content_key; only literals containing escapes go through
+    json.loads, and only that literal.
+    
+    :param line: one raw line of the response body
+    :param content_key: b'"content":"' for chat, b'"response":"' for generate
+    :return: tuple of (text_chunk, done), or None if the line needs a full parse
+    """
+    start = line.find(content_key)
+    if start == -1:
+        return None
+    start += len(content_key)
+    
+    # Find the closing quote, skipping quotes preceded by an odd number of backslashes
+    end = line.find(b'"', start)
+    while end != -1:
+        backslashes = 0
+        while line[end - 1 - backslashes] == 0x5C:  # backslash
+            backslashes += 1
+        if backslashes % 2 == 0:
+            break
+        end = line.find(b'"', end + 1)
+    if end == -1:
+        return None
+    
+    raw = line[start:end]
+    text_chunk = _json_loads(line[start - 1:end + 1]) if b'\\' in raw else raw.decode('utf-8')
+    return text_chunk, b'"done":true' in line[end:]
+
+
 def humanize_with_ollama_streaming(text, model="cogito-2.1:671b-cloud", ollama_url="http://localhost:11434", 
                                    temperature=0.7, max_tokens=2000, callback=None, prompt_file="humanizer.txt",
-                                   use_system_prompt=True):
+                                   use_system_prompt=True, keep_alive=None):
     """
     Uses Ollama to humanize text with streaming output.
     
@@ -124,82 +283,48 @@ def humanize_with_ollama_streaming(text, model="cogito-2.1:671b-cloud", ollama_u
     :param callback: optional callback function that receives each chunk of text
     :param prompt_file: path to the humanizer prompt file
     :param use_system_prompt: whether to use system/user message format
+    :param keep_alive: how long Ollama keeps the model loaded afterwards (-1 = forever, "5m", 0 = unload); None uses the server default
     :return: the complete humanized text
     """
     
-    # Load the system prompt
-    system_prompt = load_humanizer_prompt(prompt_file)
+    endpoint, body = _build_request(text, model, temperature, max_tokens, prompt_file,
+                                    use_system_prompt, stream=True, keep_alive=keep_alive)
     
     try:
-        if use_system_prompt:
-            # Use chat format with streaming
-            response = requests.post(
-                f"{ollama_url}/api/chat",
-                json={
-                    "model": model,
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": system_prompt
-                        },
-                        {
-                            "role": "user",
-                            "content": f"Rewrite this text:\n\n{text}"
-                        }
-                    ],
-                    "stream": True,
-                    "options": {
-                        "temperature": temperature,
-                        "num_predict": max_tokens
-                    }
-                },
-                stream=True,
-                timeout=120
-            )
-        else:
-            # Use generate format with streaming
-            prompt = f"{system_prompt}\n\nText to rewrite:\n{text}\n\nRewritten text:"
-            
-            response = requests.post(
-                f"{ollama_url}/api/generate",
-                json={
-                    "model": model,
-                    "prompt": prompt,
-                    "stream": True,
-                    "options": {
-                        "temperature": temperature,
-                        "num_predict": max_tokens
-                    }
-                },
-                stream=True,
-                timeout=120
-            )
+        response = _SESSION.post(f"{ollama_url}{endpoint}", data=body, headers=_JSON_HEADERS,
+                                 stream=True, timeout=120)
         
         if response.status_code == 200:
-            full_response = ""
-            for line in response.iter_lines():
+            # Chat format streams message.content, generate format streams response
+            content_key = b'"content":"' if use_system_prompt else b'"response":"'
+            chunks = []
+            # chunk_size=None hands lines over as each chunk arrives instead of waiting to fill 512 bytes.
+            # The loop runs to the end of the body rather than stopping at the done line, so
+            # the chunked terminator is read and urllib3 returns the connection to the pool.
+            for line in response.iter_lines(chunk_size=None):
                 if line:
                     try:
-                        chunk = json.loads(line)
-                        
-                        if use_system_prompt:
-                            # Extract from chat format
-                            text_chunk = chunk.get("message", {}).get("content", "")
+                        fast = _extract_stream_chunk(line, content_key)
+                        if fast is not None:
+                            text_chunk = fast[0]
                         else:
-                            # Extract from generate format
-                            text_chunk = chunk.get("response", "")
+                            chunk = _json_loads(line)
+                            
+                            if use_system_prompt:
+                                # Extract from chat format
+                                text_chunk = chunk.get("message", {}).get("content", "")
+                            else:
+                                # Extract from generate format
+                                text_chunk = chunk.get("response", "")
                         
-                        full_response += text_chunk
+                        chunks.append(text_chunk)
                         
                         if callback and text_chunk:
                             callback(text_chunk)
-                        
-                        if chunk.get("done", False):
-                            break
                     except json.JSONDecodeError:
                         continue
             
-            return full_response.strip()
+            return "".join(chunks).strip()
         else:
             error_msg = f"Ollama API returned status code {response.status_code}"
             try:
@@ -217,6 +342,246 @@ def humanize_with_ollama_streaming(text, model="cogito-2.1:671b-cloud", ollama_u
         raise Exception(f"Error calling Ollama: {str(e)}")
 
 
+_warmed_models = set()
+
+
+def warm_up_model(model="cogito-2.1:671b-cloud", ollama_url="http://localhost:11434", keep_alive=None,
+                  force=False):
+    """
+    Ask Ollama for a single token so the model is loaded before parallel requests
+    arrive; otherwise every worker stalls on the same cold start. Runs once per
+    (url, model) per process unless forced. Errors are ignored, real requests will
+    report them.
+    
+    :param model: the Ollama model to load
+    :param ollama_url: the URL of the Ollama API
+    :param keep_alive: how long Ollama keeps the model loaded afterwards (-1 = forever, "5m", 0 = unload); None uses the server default
+    :param force: warm up even if this process already did; long-running callers such as
+                  the web app use it because Ollama may have unloaded the model since
+    """
+    if not force and (ollama_url, model) in _warmed_models:
+        return
+    
+    payload = {
+        "model": model,
+        "messages": [
+            {
+                "role": "user",
+                "content": "ok"
+            }
+        ],
+        "stream": False,
+        "options": {
+            "num_predict": 1
+        }
+    }
+    if keep_alive is not None:
+        payload["keep_alive"] = keep_alive
+    
+    try:
+        _SESSION.post(f"{ollama_url}/api/chat", json=payload, timeout=300)
+        _warmed_models.add((ollama_url, model))
+    except requests.exceptions.RequestException:
+        pass
+
+
+BATCH_DELIMITER = "%%---%%"
+
+
+def _batch_body(texts, model, temperature, max_tokens, prompt_file, keep_alive):
+    """
+    Encode an /api/chat request asking for several numbered paragraphs to be rewritten at once.
+    
+    :param texts: list of texts to be humanized
+    :param model: the Ollama model to use
+    :param temperature: controls randomness
+    :param max_tokens: maximum number of tokens in the response
+    :param prompt_file: path to the humanizer prompt file
+    :param keep_alive: how long Ollama keeps the model loaded afterwards (-1 = forever, "5m", 0 = unload); None uses the server default
+    :return: the request body as bytes
+    """
+    system_prompt = load_humanizer_prompt(prompt_file)
+    numbered = "\n\n".join(f"[{n}] {text}" for n, text in enumerate(texts, 1))
+    user_content = (
+        f"Rewrite each of the following {len(texts)} paragraphs independently. "
+        f"Keep them in the same order, do not number them, and separate the outputs "
+        f"with a line containing only '{BATCH_DELIMITER}'.\n\n{numbered}"
+    )
+    return _chat_body(model, system_prompt, user_content, False,
+                      {"temperature": temperature, "num_predict": max_tokens}, keep_alive)
+
+
+def _split_batch(content, count):
+    """
+    Split a batched reply back into paragraphs, dropping any [n] prefixes the model kept.
+    
+    :param content: the model's reply
+    :param count: the number of paragraphs that were sent
+    :return: list of humanized texts
+    """
+    outputs = [re.sub(r"^\[\d+\]\s*", "", part.strip()) for part in content.split(BATCH_DELIMITER)]
+    outputs = [part for part in outputs if part]
+    if len(outputs) != count:
+        raise Exception(f"expected {count} paragraphs in batch response, got {len(outputs)}")
+    return outputs
+
+
+def humanize_batch(texts, model="cogito-2.1:671b-cloud", ollama_url="http://localhost:11434",
+                   temperature=0.7, max_tokens=2000, prompt_file="humanizer.txt", keep_alive=None):
+    """
+    Humanize several paragraphs with a single chat request so the system prompt
+    and round-trip are paid once per batch instead of once per paragraph.
+    
+    :param texts: list of texts to be humanized
+    :param model: the Ollama model to use (default: cogito-2.1:671b-cloud)
+    :param ollama_url: the URL of the Ollama API (default: http://localhost:11434)
+    :param temperature: controls randomness (0.0-1.0, higher = more creative)
+    :param max_tokens: maximum number of tokens in the response
+    :param prompt_file: path to the humanizer prompt file
+    :param keep_alive: how long Ollama keeps the model loaded afterwards (-1 = forever, "5m", 0 = unload); None uses the server default
+    :return: list of humanized texts, in the same order as texts
+    """
+    
+    if len(texts) == 1:
+        return [humanize_with_ollama(texts[0], model=model, ollama_url=ollama_url, temperature=temperature,
+                                     max_tokens=max_tokens, prompt_file=prompt_file, keep_alive=keep_alive)]
+    
+    body = _batch_body(texts, model, temperature, max_tokens, prompt_file, keep_alive)
+    
+    try:
+        response = _SESSION.post(f"{ollama_url}/api/chat", data=body, headers=_JSON_HEADERS, timeout=120)
+        
+        if response.status_code == 200:
+            return _split_batch(response.json().get("message", {}).get("content", ""), len(texts))
+        else:
+            error_msg = f"Ollama API returned status code {response.status_code}"
+            try:
+                error_detail = response.json()
+                error_msg += f": {error_detail}"
+            except:
+                error_msg += f": {response.text}"
+            raise Exception(error_msg)
+            
+    except requests.exceptions.ConnectionError:
+        raise Exception("Could not connect to Ollama. Make sure Ollama is running at " + ollama_url)
+    except requests.exceptions.Timeout:
+        raise Exception("Request to Ollama timed out")
+    except Exception as e:
+        raise Exception(f"Error calling Ollama: {str(e)}")
+
+
+def make_async_client(concurrency=4):
+    """
+    Create an httpx.AsyncClient whose connection pool matches the number of in-flight requests.
+    
+    :param concurrency: maximum number of concurrent requests to Ollama
+    :return: an httpx.AsyncClient (use with ``async with``)
+    """
+    if httpx is None:
+        raise ImportError("httpx is required for async processing. Install it with: pip install httpx")
+    
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    try:
+        return httpx.AsyncClient(http2=True, limits=limits, timeout=120)
+    except ImportError:
+        # h2 is not installed; HTTP/1.1 keep-alive still avoids per-request handshakes
+        return httpx.AsyncClient(limits=limits, timeout=120)
+
+
+async def humanize_with_ollama_async(client, text, model="cogito-2.1:671b-cloud", ollama_url="http://localhost:11434",
+                                     temperature=0.7, max_tokens=2000, prompt_file="humanizer.txt",
+                                     use_system_prompt=True, keep_alive=None):
+    """
+    Async variant of humanize_with_ollama for use with a shared httpx.AsyncClient.
+    
+    :param client: an open httpx.AsyncClient
+    :param text: the text to be humanized
+    :param model: the Ollama model to use (default: cogito-2.1:671b-cloud)
+    :param ollama_url: the URL of the Ollama API (default: http://localhost:11434)
+    :param temperature: controls randomness (0.0-1.0, higher = more creative)
+    :param max_tokens: maximum number of tokens in the response
+    :param prompt_file: path to the humanizer prompt file
+    :param use_system_prompt: whether to use system/user message format
+    :param keep_alive: how long Ollama keeps the model loaded afterwards (-1 = forever, "5m", 0 = unload); None uses the server default
+    :return: the humanized text
+    """
+    
+    endpoint, body = _build_request(text, model, temperature, max_tokens, prompt_file,
+                                    use_system_prompt, stream=False, keep_alive=keep_alive)
+    
+    try:
+        response = await client.post(f"{ollama_url}{endpoint}", content=body, headers=_JSON_HEADERS,
+                                       timeout=120)
+        
+        if response.status_code == 200:
+            result = response.json()
+            
+            if use_system_prompt:
+                return result.get("message", {}).get("content", "").strip()
+            else:
+                return result.get("response", "").strip()
+        else:
+            error_msg = f"Ollama API returned status code {response.status_code}"
+            try:
+                error_detail = response.json()
+                error_msg += f": {error_detail}"
+            except:
+                error_msg += f": {response.text}"
+            raise Exception(error_msg)
+            
+    except httpx.ConnectError:
+        raise Exception("Could not connect to Ollama. Make sure Ollama is running at " + ollama_url)
+    except httpx.TimeoutException:
+        raise Exception("Request to Ollama timed out")
+    except Exception as e:
+        raise Exception(f"Error calling Ollama: {str(e)}")
+
+
+async def humanize_batch_async(client, texts, model="cogito-2.1:671b-cloud", ollama_url="http://localhost:11434",
+                               temperature=0.7, max_tokens=2000, prompt_file="humanizer.txt", keep_alive=None):
+    """
+    Async variant of humanize_batch for use with a shared httpx.AsyncClient.
+    
+    :param client: an open httpx.AsyncClient
+    :param texts: list of texts to be humanized
+    :param model: the Ollama model to use (default: cogito-2.1:671b-cloud)
+    :param ollama_url: the URL of the Ollama API (default: http://localhost:11434)
+    :param temperature: controls randomness (0.0-1.0, higher = more creative)
+    :param max_tokens: maximum number of tokens in the response
+    :param prompt_file: path to the humanizer prompt file
+    :param keep_alive: how long Ollama keeps the model loaded afterwards (-1 = forever, "5m", 0 = unload); None uses the server default
+    :return: list of humanized texts, in the same order as texts
+    """
+    
+    if len(texts) == 1:
+        return [await humanize_with_ollama_async(client, texts[0], model=model, ollama_url=ollama_url,
+                                                 temperature=temperature, max_tokens=max_tokens,
+                                                 prompt_file=prompt_file, keep_alive=keep_alive)]
+    
+    body = _batch_body(texts, model, temperature, max_tokens, prompt_file, keep_alive)
+    
+    try:
+        response = await client.post(f"{ollama_url}/api/chat", content=body, headers=_JSON_HEADERS, timeout=120)
+        
+        if response.status_code == 200:
+            return _split_batch(response.json().get("message", {}).get("content", ""), len(texts))
+        else:
+            error_msg = f"Ollama API returned status code {response.status_code}"
+            try:
+                error_detail = response.json()
+                error_msg += f": {error_detail}"
+            except:
+                error_msg += f": {response.text}"
+            raise Exception(error_msg)
+            
+    except httpx.ConnectError:
+        raise Exception("Could not connect to Ollama. Make sure Ollama is running at " + ollama_url)
+    except httpx.TimeoutException:
+        raise Exception("Request to Ollama timed out")
+    except Exception as e:
+        raise Exception(f"Error calling Ollama: {str(e)}")
+
+
 def set_custom_prompt(text, model="cogito-2.1:671b-cloud", ollama_url="http://localhost:11434",
                      temperature=0.7, max_tokens=2000, custom_system_prompt=None,
                      use_system_prompt=True):
@@ -238,7 +603,7 @@ def set_custom_prompt(text, model="cogito-2.1:671b-cloud", ollama_url="http://lo
     
     try:
         if use_system_prompt:
-            response = requests.post(
+            response = _SESSION.post(
                 f"{ollama_url}/api/chat",
                 json={
                     "model": model,
@@ -263,7 +628,7 @@ def set_custom_prompt(text, model="cogito-2.1:671b-cloud", ollama_url="http://lo
         else:
             prompt = f"{custom_system_prompt}\n\nText to process:\n{text}\n\nOutput:"
             
-            response = requests.post(
+            response = _SESSION.post(
                 f"{ollama_url}/api/generate",
                 json={
                     "model": model,
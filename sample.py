@@ -47,9 +47,36 @@ def print_header(text):
     print_separator()
 
 
-def streaming_callback(chunk):
-    """Callback function for streaming output"""
-    print(chunk, end='', flush=True)
+def make_streaming_callback(echo=True):
+    """
+    Build a callback for streaming output that collects each chunk into a list and
+    records the time to first token. Create it right before the request starts.
+    
+    :param echo: whether to print chunks as they arrive
+    :return: (callback, state) tuple; state holds 't0', 'ttft' (seconds) and 'chunks'
+    """
+    state = {'t0': time.perf_counter(), 'ttft': None, 'chunks': []}
+    
+    def callback(chunk):
+        if state['ttft'] is None:
+            state['ttft'] = time.perf_counter() - state['t0']
+        state['chunks'].append(chunk)
+        if echo:
+            sys.stdout.write(chunk)
+            sys.stdout.flush()
+    
+    return callback, state
+
+
+def format_stream_stats(state, elapsed_time):
+    """Summarize TTFT, token count, throughput and inter-token latency for a streamed run"""
+    n = len(state['chunks'])
+    if state['ttft'] is None:
+        return "TTFT=n/a, tokens=0"
+    rate = n / elapsed_time if elapsed_time > 0 else 0
+    inter_token = (elapsed_time - state['ttft']) / (n - 1) if n > 1 else 0
+    return (f"TTFT={state['ttft'] * 1000:.0f}ms, tokens={n}, tok/s={rate:.1f}, "
+            f"inter-token={inter_token * 1000:.1f}ms")
 
 
 def test_non_streaming(text, model="cogito-2.1:671b-cloud", ollama_url="http://localhost:11434"):
@@ -62,7 +89,7 @@ def test_non_streaming(text, model="cogito-2.1:671b-cloud", ollama_url="http://l
     print("-" * 80)
     
     print("\n⏳ Processing (non-streaming)...\n")
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     try:
         humanized = humanize_with_ollama(
@@ -73,7 +100,7 @@ def test_non_streaming(text, model="cogito-2.1:671b-cloud", ollama_url="http://l
             max_tokens=2000
         )
         
-        elapsed_time = time.time() - start_time
+        elapsed_time = time.perf_counter() - start_time
         
         print("\n✅ Humanized Text:")
         print("-" * 80)
@@ -101,7 +128,8 @@ def test_streaming(text, model="cogito-2.1:671b-cloud", ollama_url="http://local
     print("✅ Humanized Text (live):")
     print("-" * 80)
     
-    start_time = time.time()
+    streaming_callback, stream_state = make_streaming_callback()
+    start_time = stream_state['t0']
     
     try:
         humanized = humanize_with_ollama_streaming(
@@ -113,11 +141,12 @@ def test_streaming(text, model="cogito-2.1:671b-cloud", ollama_url="http://local
             callback=streaming_callback
         )
         
-        elapsed_time = time.time() - start_time
+        elapsed_time = time.perf_counter() - start_time
         
         print()
         print("-" * 80)
         print(f"\n⏱️  Processing time: {elapsed_time:.2f} seconds")
+        print(f"📦 {format_stream_stats(stream_state, elapsed_time)}")
         
         return True
         
@@ -137,7 +166,7 @@ def test_comparison(text, model="cogito-2.1:671b-cloud", ollama_url="http://loca
     
     # Non-streaming test
     print("\n⏳ Running non-streaming test...")
-    start_time_non = time.time()
+    start_time_non = time.perf_counter()
     
     try:
         humanized_non = humanize_with_ollama(
@@ -147,7 +176,7 @@ def test_comparison(text, model="cogito-2.1:671b-cloud", ollama_url="http://loca
             temperature=0.7,
             max_tokens=2000
         )
-        time_non = time.time() - start_time_non
+        time_non = time.perf_counter() - start_time_non
         print(f"✅ Non-streaming completed in {time_non:.2f} seconds")
     except Exception as e:
         print(f"❌ Non-streaming failed: {str(e)}")
@@ -156,7 +185,8 @@ def test_comparison(text, model="cogito-2.1:671b-cloud", ollama_url="http://loca
     
     # Streaming test
     print("\n⏳ Running streaming test...")
-    start_time_stream = time.time()
+    streaming_callback, stream_state = make_streaming_callback(echo=False)
+    start_time_stream = stream_state['t0']
     
     try:
         humanized_stream = humanize_with_ollama_streaming(
@@ -164,9 +194,10 @@ def test_comparison(text, model="cogito-2.1:671b-cloud", ollama_url="http://loca
             model=model,
             ollama_url=ollama_url,
             temperature=0.7,
-            max_tokens=2000
+            max_tokens=2000,
+            callback=streaming_callback
         )
-        time_stream = time.time() - start_time_stream
+        time_stream = time.perf_counter() - start_time_stream
         print(f"✅ Streaming completed in {time_stream:.2f} seconds")
     except Exception as e:
         print(f"❌ Streaming failed: {str(e)}")
@@ -193,6 +224,8 @@ def test_comparison(text, model="cogito-2.1:671b-cloud", ollama_url="http://loca
     print("\n📊 Performance:")
     print(f"   Non-streaming: {time_non:.2f} seconds")
     print(f"   Streaming:     {time_stream:.2f} seconds")
+    if time_stream > 0:
+        print(f"   Streaming stats: {format_stream_stats(stream_state, time_stream)}")
     
     if time_non > 0 and time_stream > 0:
         diff = abs(time_non - time_stream)
@@ -2,13 +2,29 @@ import streamlit as st
 import os
 import tempfile
 import shutil
+import asyncio
+import functools
+import threading
 from pathlib import Path
 import time
 import re
-from docx import Document
-from docx_processor import process_docx_with_progress
-from ollama_humanize import humanize_with_ollama
-import requests
+from collections import Counter
+import numpy as np
+from docx_processor import process_docx_async_with_progress, process_docx_with_progress, read_docx_paragraph_texts
+from ollama_humanize import init_session, warm_up_model
+
+# Ollama keep_alive values offered in the sidebar; -1 keeps the model loaded between paragraphs
+KEEP_ALIVE_OPTIONS = {
+    "Until Ollama restarts": -1,
+    "30 minutes": "30m",
+    "5 minutes (Ollama default)": "5m"
+}
+
+# Minimum seconds between progress/preview redraws while processing
+UI_UPDATE_INTERVAL = 0.1
+
+# Paragraphs packed into one request when Batch Mode is on
+BATCH_MODE_SIZE = 8
 
 # Page configuration
 st.set_page_config(
@@ -19,7 +35,7 @@ st.set_page_config(
 )
 
 # Custom CSS for better styling
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     .main-header {
         font-size: 3rem;
@@ -62,84 +78,165 @@ st.markdown("""
         margin: 1rem 0;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+
+TRANSITION_WORDS = (
+    'however', 'nevertheless', 'therefore', 'thus', 'consequently', 'furthermore', 'moreover',
+    'in addition', 'in fact', 'actually', 'basically', 'arguably', 'indeed', 'instead', 'meanwhile',
+    'nonetheless', 'otherwise', 'likewise', 'similarly', 'in other words', 'for example',
+    'for instance', 'in particular', 'specifically', 'especially', 'notably', 'chiefly', 'mainly', 'mostly'
+)
+FILLER_WORDS = (
+    'um', 'uh', 'like', 'you know', 'sort of', 'kind of', 'literally', 'basically', 'actually',
+    'anyway', 'so', 'well', 'right', 'okay', 'just'
+)
+
+
+def phrase_trie_pattern(phrases):
+    """
+    Regex alternation for a set of literal phrases, factored into a trie so the engine
+    follows one branch per character instead of retrying every phrase at each position.
+    
+    :param phrases: iterable of literal phrases
+    :return: a non-capturing regex pattern string matching any of the phrases
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+    
+    def build(node):
+        branches = [re.escape(ch) + build(node[ch]) for ch in sorted(node) if ch]
+        if not branches:
+            return ''
+        if len(branches) == 1 and '' not in node:
+            return branches[0]
+        group = '(?:' + '|'.join(branches) + ')'
+        # A phrase ending here makes the rest optional, e.g. like(?:wise)?
+        return group + '?' if '' in node else group
+    
+    return build(trie)
+
+
+# Patterns used by the humanness score, compiled once. Transitions and fillers never
+# overlap except on identical words, so one pass over the lowercased text counts both;
+# each hit is then looked up to see which lists it belongs to. The lookahead skips
+# word starts that can't begin any phrase before trying the trie. This is one
+# trie-factored alternation and one pass per text; it still backtracks through
+# optional branches such as so(?:rt of)?, it is not a keyword automaton.
+# Contractions stay a separate pattern: they are an open class matched on the
+# original casing, not a keyword list.
+SENT_SPLIT_RE = re.compile(r'[.!?]+')
+CONTRACTIONS_RE = re.compile(r"\b\w+'[a-z]+\b")
+WORD_LIST_RE = re.compile(
+    r'\b(?=[' + ''.join(sorted({phrase[0] for phrase in TRANSITION_WORDS + FILLER_WORDS})) + r'])'
+    r'(?:' + phrase_trie_pattern(TRANSITION_WORDS + FILLER_WORDS) + r')\b'
+)
+WORD_LIST_CATEGORIES = {
+    phrase: (phrase in TRANSITION_WORDS, phrase in FILLER_WORDS)
+    for phrase in TRANSITION_WORDS + FILLER_WORDS
+}
 
 
-def sent_tokenize(text):
-    """Simple sentence tokenizer"""
-    sentences = re.split(r'[.!?]+', text)
-    return [s.strip() for s in sentences if s.strip()]
+def sentence_word_counts(text):
+    """
+    Word count of each sentence, splitting every sentence once. A sentence that is
+    non-empty after stripping always has at least one word, so dropping zero counts
+    drops exactly the blank sentences.
+    
+    :param text: the text to analyze
+    :return: list of word counts, one per sentence
+    """
+    return [n for n in map(len, map(str.split, SENT_SPLIT_RE.split(text))) if n]
 
 
-def calculate_humanness_score(text):
+@st.cache_data(show_spinner=False, max_entries=16)
+def calculate_humanness_score(text, sample_chars=None):
     """
-    Calculate human-likeness score based on various text characteristics
+    Calculate human-likeness score based on various text characteristics. Results are
+    cached on the text, so re-uploading a file or switching the sample size back
+    returns the earlier score instead of scanning again.
     
     :param text: the text to analyze
+    :param sample_chars: if set and the text is longer, score only a slice of this many
+                         characters from the middle of the text (None scores everything)
     :return: tuple of (score, metrics_dict)
     """
     humanness_score = 0
     metrics = {}
     
+    if sample_chars and len(text) > sample_chars:
+        start = (len(text) - sample_chars) // 2
+        text = text[start:start + sample_chars]
+    
     # Sentence analysis
-    sentences = sent_tokenize(text)
-    sentence_count = len(sentences)
+    word_counts = sentence_word_counts(text)
+    sentence_count = len(word_counts)
     metrics['sentence_count'] = sentence_count
     
     if sentence_count == 0:
         return 0, metrics
     
     # Sentence length variance
-    sent_lengths = [len(s.split()) for s in sentences]
-    if sent_lengths:
-        avg_sentence_length = sum(sent_lengths) / len(sent_lengths)
-        sentence_length_variance = sum((x - avg_sentence_length) ** 2 for x in sent_lengths) / len(sent_lengths)
-        metrics['avg_sentence_length'] = round(avg_sentence_length, 1)
-        metrics['sentence_variance'] = round(sentence_length_variance, 1)
-        
-        if sentence_length_variance > 10:
-            humanness_score += 20
-        elif sentence_length_variance > 5:
-            humanness_score += 10
+    sent_lengths = np.array(word_counts, dtype=np.int64)
+    # Integer sums give n² times the variance exactly, so the thresholds below are
+    # decided without rounding error (a variance of exactly 10 must not count as > 10)
+    total = int(sent_lengths.sum())
+    scaled_variance = sentence_count * int(sent_lengths @ sent_lengths) - total * total
+    scale = sentence_count * sentence_count
+    avg_sentence_length = total / sentence_count
+    sentence_length_variance = scaled_variance / scale
+    metrics['avg_sentence_length'] = round(avg_sentence_length, 1)
+    metrics['sentence_variance'] = round(sentence_length_variance, 1)
+    
+    if scaled_variance > 10 * scale:
+        humanness_score += 20
+    elif scaled_variance > 5 * scale:
+        humanness_score += 10
     
     # Contractions (natural human writing)
-    contractions = len(re.findall(r"\b\w+'[a-z]+\b", text))
+    contractions = len(CONTRACTIONS_RE.findall(text))
     metrics['contractions'] = contractions
     if contractions > 0:
         humanness_score += min(15, contractions * 3)
     
+    # Transition and filler words, counted in a single pass. The text is lowercased
+    # once here and reused for the 3-grams below; lower() rather than casefold(),
+    # which expands characters like 'ß' and would shift the word counts.
+    lower_text = text.lower()
+    transitions = 0
+    fillers = 0
+    for phrase, count in Counter(WORD_LIST_RE.findall(lower_text)).items():
+        is_transition, is_filler = WORD_LIST_CATEGORIES[phrase]
+        if is_transition:
+            transitions += count
+        if is_filler:
+            fillers += count
+    
     # Transition words (good variety indicates natural flow)
-    transitions = len(re.findall(
-        r'\b(however|nevertheless|therefore|thus|consequently|furthermore|moreover|'
-        r'in addition|in fact|actually|basically|arguably|indeed|instead|meanwhile|'
-        r'nonetheless|otherwise|likewise|similarly|in other words|for example|'
-        r'for instance|in particular|specifically|especially|notably|chiefly|mainly|mostly)\b',
-        text.lower()
-    ))
     metrics['transitions'] = transitions
     humanness_score += min(15, transitions * 3)
     
     # Filler words (very human, but not too many)
-    fillers = len(re.findall(
-        r'\b(um|uh|like|you know|sort of|kind of|literally|basically|actually|'
-        r'anyway|so|well|right|okay|just)\b',
-        text.lower()
-    ))
     metrics['fillers'] = fillers
     humanness_score += min(10, fillers * 2)
     
     # Penalty for monotonous sentence length (robotic)
-    if sentence_count > 5 and sent_lengths:
-        if abs(max(sent_lengths) - min(sent_lengths)) < 3:
+    if sentence_count > 5:
+        if sent_lengths.max() - sent_lengths.min() < 3:
             humanness_score -= 20
             metrics['monotonous'] = True
         else:
             metrics['monotonous'] = False
     
     # Check for repeated phrases (AI tends to repeat)
-    words = text.lower().split()
-    three_grams = [' '.join(words[i:i+3]) for i in range(len(words)-2)]
-    repeated_phrases = len(three_grams) - len(set(three_grams))
+    words = lower_text.split()
+    # Words contain no whitespace, so word tuples identify 3-grams without joining strings
+    three_gram_count = max(0, len(words) - 2)
+    repeated_phrases = three_gram_count - len(set(zip(words, words[1:], words[2:])))
     metrics['repeated_phrases'] = repeated_phrases
     if repeated_phrases > 3:
         humanness_score -= min(20, repeated_phrases * 2)
@@ -150,89 +247,208 @@ def calculate_humanness_score(text):
     return humanness_score, metrics
 
 
-def check_ollama_connection(url):
-    """Check if Ollama is running and accessible"""
-    try:
-        response = requests.get(f"{url}/api/tags", timeout=5)
-        return response.status_code == 200
-    except:
-        return False
+@functools.lru_cache(maxsize=128)
+def score_ring_html(score):
+    """Ring chart HTML for a 0-100 humanness score, built once per distinct score"""
+    color = 'green' if score > 70 else 'orange' if score > 40 else 'red'
+    return f"""
+                <div style="text-align:center">
+                    <div style="margin:20px auto; width:200px; height:200px; position:relative;">
+                        <div style="position:absolute; width:200px; height:200px; border-radius:50%; background:conic-gradient(from 0deg, {color} 0%, {color} {score}%, #e0e0e0 {score}%, #e0e0e0 100%);"></div>
+                        <div style="position:absolute; width:150px; height:150px; border-radius:50%; background:white; top:25px; left:25px; display:flex; align-items:center; justify-content:center;">
+                            <span style="font-size:40px; font-weight:bold; color:black;">{score}%</span>
+                        </div>
+                    </div>
+                </div>
+                """
 
 
-def get_available_models(url):
-    """Get list of available Ollama models"""
+@st.cache_resource
+def get_http_session():
+    """Pooled keep-alive session, shared with the Ollama calls made while processing"""
+    return init_session(10)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def fetch_ollama_tags(url):
+    """
+    Fetch /api/tags once per URL for the connection check and the model list, so
+    reruns triggered by other widgets don't go back to the network.
+    
+    :param url: the URL of the Ollama API
+    :return: the parsed response, or None if Ollama couldn't be reached
+    """
     try:
-        response = requests.get(f"{url}/api/tags", timeout=5)
+        response = get_http_session().get(f"{url}/api/tags", timeout=5)
         if response.status_code == 200:
-            models = response.json().get("models", [])
-            return [model["name"] for model in models]
-        return []
+            return response.json()
+        return None
     except:
-        return []
+        return None
 
 
-def extract_text_from_docx(file_path):
-    """Extract all text from a docx file"""
-    doc = Document(file_path)
-    text = []
-    for paragraph in doc.paragraphs:
-        if paragraph.text.strip():
-            text.append(paragraph.text)
-    return '\n\n'.join(text)
+def check_ollama_connection(url):
+    """Check if Ollama is running and accessible"""
+    return fetch_ollama_tags(url) is not None
+
+
+def get_available_models(url):
+    """Get list of available Ollama models"""
+    tags = fetch_ollama_tags(url)
+    if tags is None:
+        return []
+    return [model["name"] for model in tags.get("models", [])]
 
 
-def process_file_with_progress(uploaded_file, model, url, temperature, max_tokens, preserve_formatting):
-    """Process uploaded file with progress tracking"""
+def get_uploaded_document(uploaded_file, sample_chars=None):
+    """
+    Parse the uploaded file and save it to disk once per upload. The saved path,
+    preview stats, original text and its humanness score are kept in session state,
+    keyed by file_id, so reruns and processing reuse them instead of writing and
+    parsing again. Only the scores are redone if the scoring sample size changes.
     
-    # Create temporary directory
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # Save uploaded file
-        input_path = os.path.join(temp_dir, uploaded_file.name)
+    The copy lives in a TemporaryDirectory held by the session entry, so it is removed
+    when the upload changes or, if the tab is simply closed, when the session's state
+    is garbage collected.
+    """
+    cached = st.session_state.get('uploaded_doc')
+    if cached and cached['file_id'] == uploaded_file.file_id:
+        if cached['score_sample_chars'] != sample_chars:
+            cached['original_score'] = calculate_humanness_score(cached['original_text'], sample_chars)
+            processed = cached.get('processed')
+            if processed:
+                processed['score'] = calculate_humanness_score(processed['text'], sample_chars)
+            cached['score_sample_chars'] = sample_chars
+        return cached
+    
+    discard_uploaded_document()
+    
+    # UploadedFile is a BytesIO, so read the preview straight from memory; only the
+    # main document part is parsed, not the whole package
+    uploaded_file.seek(0)
+    texts = read_docx_paragraph_texts(uploaded_file)
+    
+    # The processors work on paths, so write the upload to disk exactly once
+    temp_dir = tempfile.TemporaryDirectory()
+    input_path = os.path.join(temp_dir.name, uploaded_file.name)
+    try:
         with open(input_path, "wb") as f:
             f.write(uploaded_file.getbuffer())
+    except Exception:
+        temp_dir.cleanup()
+        raise
+    
+    original_text = '\n\n'.join(texts)
+    cached = {
+        'file_id': uploaded_file.file_id,
+        'temp_dir': temp_dir,
+        'input_path': input_path,
+        'paragraph_count': len(texts),
+        # Paragraphs are joined on whitespace, so one split of the whole text counts the same words
+        'word_count': len(original_text.split()),
+        'original_text': original_text,
+        # Score the original up front so finishing a run only has to score the output
+        'original_score': calculate_humanness_score(original_text, sample_chars),
+        'score_sample_chars': sample_chars
+    }
+    st.session_state['uploaded_doc'] = cached
+    return cached
+
+
+def discard_uploaded_document():
+    """Remove the saved copy of the previous upload, if any"""
+    cached = st.session_state.pop('uploaded_doc', None)
+    if cached:
+        cached['temp_dir'].cleanup()
+
+
+def process_file_with_progress(input_path, original_text, model, url, temperature, max_tokens,
+                               preserve_formatting, concurrency=1, keep_alive=None, batch_size=1):
+    """Process the saved upload with progress tracking"""
+    
+    # Progress tracking
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    token_placeholder = st.empty()
+    token_buffer = []
+    # Each widget update is a websocket round-trip, so redraw at most every UI_UPDATE_INTERVAL
+    last_progress_update = [0.0]
+    last_token_update = [0.0]
+    
+    def progress_callback(current, total, message):
+        # A new paragraph is starting; reset the live preview
+        token_buffer.clear()
+        now = time.monotonic()
+        if now - last_progress_update[0] < UI_UPDATE_INTERVAL and current < total:
+            return
+        last_progress_update[0] = now
+        progress = current / total if total > 0 else 0
+        progress_bar.progress(progress)
+        status_text.text(f"{message} ({current}/{total})")
+    
+    def stream_callback(chunk):
+        # Collect chunks in a list and join, rather than growing a string with +=
+        token_buffer.append(chunk)
+        now = time.monotonic()
+        if now - last_token_update[0] < UI_UPDATE_INTERVAL:
+            return
+        last_token_update[0] = now
+        token_placeholder.markdown(''.join(token_buffer))
+    
+    try:
+        result = None
+        if concurrency > 1 or batch_size > 1:
+            # Humanize several paragraphs at once over a shared async client
+            try:
+                result = asyncio.run(process_docx_async_with_progress(
+                    input_path,
+                    ollama_model=model,
+                    ollama_url=url,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    preserve_formatting=preserve_formatting,
+                    progress_callback=progress_callback,
+                    max_concurrency=concurrency,
+                    keep_alive=keep_alive,
+                    batch_size=batch_size,
+                    return_text=True
+                ))
+            except ImportError:
+                st.warning("httpx is not installed; processing paragraphs one at a time.")
         
-        # Extract original text for comparison
-        original_text = extract_text_from_docx(input_path)
-        
-        # Progress tracking
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        def progress_callback(current, total, message):
-            progress = current / total if total > 0 else 0
-            progress_bar.progress(progress)
-            status_text.text(f"{message} ({current}/{total})")
-        
-        try:
-            # Process the document
-            output_path = process_docx_with_progress(
+        if result is None:
+            # Process the document sequentially, streaming tokens as they arrive
+            result = process_docx_with_progress(
                 input_path,
                 ollama_model=model,
                 ollama_url=url,
                 temperature=temperature,
                 max_tokens=max_tokens,
                 preserve_formatting=preserve_formatting,
-                progress_callback=progress_callback
+                progress_callback=progress_callback,
+                stream_callback=stream_callback,
+                keep_alive=keep_alive,
+                return_text=True
             )
-            
-            # Extract processed text
-            processed_text = extract_text_from_docx(output_path)
-            
-            # Read the processed file
-            with open(output_path, "rb") as f:
-                processed_data = f.read()
-            
-            progress_bar.progress(1.0)
-            status_text.text("✅ Processing complete!")
-            
-            return processed_data, os.path.basename(output_path), original_text, processed_text
-            
-        except Exception as e:
-            st.error(f"Error processing file: {str(e)}")
-            return None, None, None, None
+        
+        # The file is written next to the saved upload; the caller reads its bytes once
+        output_path, processed_text = result
+        
+        progress_bar.progress(1.0)
+        status_text.text("✅ Processing complete!")
+        token_placeholder.empty()
+        
+        return output_path, os.path.basename(output_path), original_text, processed_text
+        
+    except Exception as e:
+        st.error(f"Error processing file: {str(e)}")
+        return None, None, None, None
 
 
 def main():
+    # Streamlit drops elements a rerun doesn't emit, so the styles are sent every run
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+    
     # Header
     st.markdown('<h1 class="main-header">📝 DocHumanize</h1>', unsafe_allow_html=True)
     st.markdown('<p class="sub-header">Transform AI-generated text into natural, human-like writing</p>', unsafe_allow_html=True)
@@ -252,6 +468,7 @@ def main():
         # Check connection
         if st.button("🔍 Test Connection"):
             with st.spinner("Testing connection..."):
+                fetch_ollama_tags.clear()
                 if check_ollama_connection(ollama_url):
                     st.success("✅ Connected to Ollama!")
                 else:
@@ -275,6 +492,26 @@ def main():
             )
             st.warning("⚠️ Could not fetch models. Ensure Ollama is running.")
         
+        keep_alive_label = st.selectbox(
+            "Keep Model Loaded",
+            options=list(KEEP_ALIVE_OPTIONS),
+            index=0,
+            help="How long Ollama keeps the model in memory after each request"
+        )
+        keep_alive = KEEP_ALIVE_OPTIONS[keep_alive_label]
+        
+        # Load the selected model in the background so the first paragraph doesn't wait on it.
+        # The server outlives any one load (keep-alive expiry, Ollama restarts), so skip the
+        # process-wide once-only check and rely on this session's record instead.
+        if available_models and st.session_state.get('warmed') != (ollama_url, selected_model):
+            threading.Thread(
+                target=warm_up_model,
+                args=(selected_model, ollama_url, keep_alive),
+                kwargs={'force': True},
+                daemon=True
+            ).start()
+            st.session_state['warmed'] = (ollama_url, selected_model)
+        
         st.divider()
         
         # Processing settings
@@ -304,6 +541,30 @@ def main():
             help="Maintain original document formatting (bold, italic, fonts, etc.)"
         )
         
+        concurrency = st.slider(
+            "Concurrent Requests",
+            min_value=1,
+            max_value=16,
+            value=8,
+            help="Paragraphs sent to Ollama at the same time (1 = sequential with live preview)"
+        )
+        
+        batch_mode = st.checkbox(
+            "Batch Mode",
+            value=False,
+            help=f"Rewrite up to {BATCH_MODE_SIZE} paragraphs per request; faster on long documents"
+        )
+        
+        with st.expander("Advanced"):
+            score_sample_chars = st.number_input(
+                "Score Sample Size (characters)",
+                min_value=0,
+                max_value=5_000_000,
+                value=0,
+                step=50_000,
+                help="Score only this many characters from the middle of long documents (0 = whole document)"
+            ) or None
+        
         st.divider()
         
         # Information
@@ -341,28 +602,22 @@ def main():
             st.success(f"✅ File uploaded: {uploaded_file.name}")
             
             # Show file info
-            file_size = len(uploaded_file.getbuffer()) / 1024
+            file_size = uploaded_file.size / 1024
             st.info(f"📊 File size: {file_size:.2f} KB")
             
             # Preview document stats
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as tmp_file:
-                tmp_file.write(uploaded_file.getbuffer())
-                tmp_path = tmp_file.name
-            
             try:
-                doc = Document(tmp_path)
-                paragraph_count = len([p for p in doc.paragraphs if p.text.strip()])
-                word_count = sum(len(p.text.split()) for p in doc.paragraphs)
+                uploaded_doc = get_uploaded_document(uploaded_file, score_sample_chars)
                 
                 col_a, col_b = st.columns(2)
                 with col_a:
-                    st.metric("Paragraphs", paragraph_count)
+                    st.metric("Paragraphs", uploaded_doc['paragraph_count'])
                 with col_b:
-                    st.metric("Words (approx)", word_count)
-                
-                os.unlink(tmp_path)
+                    st.metric("Words (approx)", uploaded_doc['word_count'])
             except Exception as e:
                 st.warning(f"Could not preview document: {str(e)}")
+        else:
+            discard_uploaded_document()
     
     with col2:
         st.header("🎯 Quick Actions")
@@ -376,138 +631,151 @@ def main():
         )
         
         if uploaded_file:
-            estimated_time = len(uploaded_file.getbuffer()) / 10240  # Rough estimate
+            estimated_time = uploaded_file.size / 10240  # Rough estimate
             st.caption(f"⏱️ Estimated time: ~{estimated_time:.1f} min")
     
     # Processing section
-    if process_button and uploaded_file:
+    if process_button and uploaded_file and 'uploaded_doc' not in st.session_state:
+        # The preview parse failed, and processing needs the same parse
+        st.error("❌ This document could not be read, so it can't be processed. "
+                 "Make sure it is a valid .docx file and upload it again.")
+    elif process_button and uploaded_file:
         st.divider()
         st.header("⚡ Processing")
         
         start_time = time.time()
         
         # Process the document
-        processed_data, output_filename, original_text, processed_text = process_file_with_progress(
-            uploaded_file,
+        uploaded_doc = st.session_state['uploaded_doc']
+        uploaded_doc.pop('processed', None)
+        output_path, output_filename, original_text, processed_text = process_file_with_progress(
+            uploaded_doc['input_path'],
+            uploaded_doc['original_text'],
             selected_model,
             ollama_url,
             temperature,
             max_tokens,
-            preserve_formatting
+            preserve_formatting,
+            concurrency,
+            keep_alive,
+            BATCH_MODE_SIZE if batch_mode else 1
         )
         
-        if processed_data and processed_text:
-            elapsed_time = time.time() - start_time
-            
-            st.markdown(
-                f'<div class="success-box">✅ <strong>Success!</strong> '
-                f'Document processed in {elapsed_time:.1f} seconds</div>',
-                unsafe_allow_html=True
-            )
-            
-            # Calculate humanness scores
-            original_score, original_metrics = calculate_humanness_score(original_text)
-            processed_score, processed_metrics = calculate_humanness_score(processed_text)
-            
-            # Human-likeness Score Analysis
-            st.header("🎯 Human-likeness Analysis")
-            
-            col_score1, col_score2 = st.columns(2)
-            
-            with col_score1:
-                st.subheader("Original Document")
-                color_orig = 'green' if original_score > 70 else 'orange' if original_score > 40 else 'red'
-                st.markdown(f"""
-                <div style="text-align:center">
-                    <div style="margin:20px auto; width:200px; height:200px; position:relative;">
-                        <div style="position:absolute; width:200px; height:200px; border-radius:50%; background:conic-gradient(from 0deg, {color_orig} 0%, {color_orig} {original_score}%, #e0e0e0 {original_score}%, #e0e0e0 100%);"></div>
-                        <div style="position:absolute; width:150px; height:150px; border-radius:50%; background:white; top:25px; left:25px; display:flex; align-items:center; justify-content:center;">
-                            <span style="font-size:40px; font-weight:bold; color:black;">{original_score}%</span>
-                        </div>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                with st.expander("📊 Detailed Metrics"):
-                    st.write(f"**Sentences:** {original_metrics.get('sentence_count', 0)}")
-                    st.write(f"**Avg Sentence Length:** {original_metrics.get('avg_sentence_length', 0)} words")
-                    st.write(f"**Sentence Variance:** {original_metrics.get('sentence_variance', 0)}")
-                    st.write(f"**Contractions:** {original_metrics.get('contractions', 0)}")
-                    st.write(f"**Transitions:** {original_metrics.get('transitions', 0)}")
-                    st.write(f"**Fillers:** {original_metrics.get('fillers', 0)}")
-                    st.write(f"**Repeated Phrases:** {original_metrics.get('repeated_phrases', 0)}")
-            
-            with col_score2:
-                st.subheader("Processed Document")
-                color_proc = 'green' if processed_score > 70 else 'orange' if processed_score > 40 else 'red'
-                st.markdown(f"""
-                <div style="text-align:center">
-                    <div style="margin:20px auto; width:200px; height:200px; position:relative;">
-                        <div style="position:absolute; width:200px; height:200px; border-radius:50%; background:conic-gradient(from 0deg, {color_proc} 0%, {color_proc} {processed_score}%, #e0e0e0 {processed_score}%, #e0e0e0 100%);"></div>
-                        <div style="position:absolute; width:150px; height:150px; border-radius:50%; background:white; top:25px; left:25px; display:flex; align-items:center; justify-content:center;">
-                            <span style="font-size:40px; font-weight:bold; color:black;">{processed_score}%</span>
-                        </div>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                with st.expander("📊 Detailed Metrics"):
-                    st.write(f"**Sentences:** {processed_metrics.get('sentence_count', 0)}")
-                    st.write(f"**Avg Sentence Length:** {processed_metrics.get('avg_sentence_length', 0)} words")
-                    st.write(f"**Sentence Variance:** {processed_metrics.get('sentence_variance', 0)}")
-                    st.write(f"**Contractions:** {processed_metrics.get('contractions', 0)}")
-                    st.write(f"**Transitions:** {processed_metrics.get('transitions', 0)}")
-                    st.write(f"**Fillers:** {processed_metrics.get('fillers', 0)}")
-                    st.write(f"**Repeated Phrases:** {processed_metrics.get('repeated_phrases', 0)}")
+        if output_path and processed_text:
+            # Keep the result with the upload, so reruns from other widgets redraw it
+            # without processing or scoring again. st.download_button holds the whole
+            # file in memory anyway, so read it once here rather than on every rerun.
+            with open(output_path, "rb") as processed_file:
+                output_bytes = processed_file.read()
+            os.remove(output_path)
+            uploaded_doc['processed'] = {
+                'output_bytes': output_bytes,
+                'output_filename': output_filename,
+                'text': processed_text,
+                'score': calculate_humanness_score(processed_text, score_sample_chars),
+                'elapsed_time': time.time() - start_time
+            }
+    
+    # Results section
+    uploaded_doc = st.session_state.get('uploaded_doc') if uploaded_file else None
+    processed = uploaded_doc.get('processed') if uploaded_doc else None
+    if processed:
+        if not process_button:
+            st.divider()
+        
+        output_filename = processed['output_filename']
+        original_text = uploaded_doc['original_text']
+        processed_text = processed['text']
+        
+        st.markdown(
+            f'<div class="success-box">✅ <strong>Success!</strong> '
+            f'Document processed in {processed["elapsed_time"]:.1f} seconds</div>',
+            unsafe_allow_html=True
+        )
+        
+        # Both scores were computed once, when the file was parsed and processed
+        original_score, original_metrics = uploaded_doc['original_score']
+        processed_score, processed_metrics = processed['score']
+        
+        # Human-likeness Score Analysis
+        st.header("🎯 Human-likeness Analysis")
+        
+        col_score1, col_score2 = st.columns(2)
+        
+        with col_score1:
+            st.subheader("Original Document")
+            st.markdown(score_ring_html(original_score), unsafe_allow_html=True)
             
-            # Score improvement
-            improvement = processed_score - original_score
-            if improvement > 0:
-                st.success(f"🎉 Human-likeness improved by {improvement} points!")
-            elif improvement < 0:
-                st.warning(f"⚠️ Human-likeness decreased by {abs(improvement)} points. Try adjusting temperature.")
-            else:
-                st.info("ℹ️ Human-likeness score remained the same.")
+            with st.expander("📊 Detailed Metrics"):
+                st.write(f"**Sentences:** {original_metrics.get('sentence_count', 0)}")
+                st.write(f"**Avg Sentence Length:** {original_metrics.get('avg_sentence_length', 0)} words")
+                st.write(f"**Sentence Variance:** {original_metrics.get('sentence_variance', 0)}")
+                st.write(f"**Contractions:** {original_metrics.get('contractions', 0)}")
+                st.write(f"**Transitions:** {original_metrics.get('transitions', 0)}")
+                st.write(f"**Fillers:** {original_metrics.get('fillers', 0)}")
+                st.write(f"**Repeated Phrases:** {original_metrics.get('repeated_phrases', 0)}")
+        
+        with col_score2:
+            st.subheader("Processed Document")
+            st.markdown(score_ring_html(processed_score), unsafe_allow_html=True)
             
-            st.divider()
+            with st.expander("📊 Detailed Metrics"):
+                st.write(f"**Sentences:** {processed_metrics.get('sentence_count', 0)}")
+                st.write(f"**Avg Sentence Length:** {processed_metrics.get('avg_sentence_length', 0)} words")
+                st.write(f"**Sentence Variance:** {processed_metrics.get('sentence_variance', 0)}")
+                st.write(f"**Contractions:** {processed_metrics.get('contractions', 0)}")
+                st.write(f"**Transitions:** {processed_metrics.get('transitions', 0)}")
+                st.write(f"**Fillers:** {processed_metrics.get('fillers', 0)}")
+                st.write(f"**Repeated Phrases:** {processed_metrics.get('repeated_phrases', 0)}")
+        
+        # Score improvement
+        improvement = processed_score - original_score
+        if improvement > 0:
+            st.success(f"🎉 Human-likeness improved by {improvement} points!")
+        elif improvement < 0:
+            st.warning(f"⚠️ Human-likeness decreased by {abs(improvement)} points. Try adjusting temperature.")
+        else:
+            st.info("ℹ️ Human-likeness score remained the same.")
+        
+        st.divider()
+        
+        # Download button
+        st.download_button(
+            label="📥 Download Processed Document",
+            data=processed['output_bytes'],
+            file_name=output_filename,
+            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            type="primary",
+            use_container_width=True
+        )
+        
+        # Show text comparison
+        with st.expander("📊 View Text Comparison"):
+            col_before, col_after = st.columns(2)
             
-            # Download button
-            st.download_button(
-                label="📥 Download Processed Document",
-                data=processed_data,
-                file_name=output_filename,
-                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                type="primary",
-                use_container_width=True
-            )
+            with col_before:
+                st.subheader("Original")
+                # Show first 500 characters
+                preview_orig = original_text[:500] + ("..." if len(original_text) > 500 else "")
+                st.text_area(
+                    "Before",
+                    value=preview_orig,
+                    height=300,
+                    disabled=True,
+                    label_visibility="collapsed"
+                )
             
-            # Show text comparison
-            with st.expander("📊 View Text Comparison"):
-                col_before, col_after = st.columns(2)
-                
-                with col_before:
-                    st.subheader("Original")
-                    # Show first 500 characters
-                    preview_orig = original_text[:500] + ("..." if len(original_text) > 500 else "")
-                    st.text_area(
-                        "Before",
-                        value=preview_orig,
-                        height=300,
-                        disabled=True,
-                        label_visibility="collapsed"
-                    )
-                
-                with col_after:
-                    st.subheader("Humanized")
-                    # Show first 500 characters
-                    preview_proc = processed_text[:500] + ("..." if len(processed_text) > 500 else "")
-                    st.text_area(
-                        "After",
-                        value=preview_proc,
-                        height=300,
-                        disabled=True,
-                        label_visibility="collapsed"
-                    )
+            with col_after:
+                st.subheader("Humanized")
+                # Show first 500 characters
+                preview_proc = processed_text[:500] + ("..." if len(processed_text) > 500 else "")
+                st.text_area(
+                    "After",
+                    value=preview_proc,
+                    height=300,
+                    disabled=True,
+                    label_visibility="collapsed"
+                )
     
     # Footer
     st.divider()
@@ -0,0 +1,192 @@
+import json
+import random
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+import ollama_humanize
+
+
+class _StreamingHandler(BaseHTTPRequestHandler):
+    """Streams a chat response, sending the chunked terminator as a separate write"""
+    protocol_version = "HTTP/1.1"
+    client_ports = []
+
+    def log_message(self, *args):
+        pass
+
+    def _write_chunk(self, data):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.client_ports.append(self.client_address[1])
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for piece, done in (("Hello ", False), ("world", False), ("", True)):
+            line = {"message": {"role": "assistant", "content": piece}, "done": done}
+            self._write_chunk((json.dumps(line) + "\n").encode())
+            self.wfile.flush()
+        time.sleep(0.05)
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class StreamingConnectionReuseTest(unittest.TestCase):
+
+    def setUp(self):
+        _StreamingHandler.client_ports = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _StreamingHandler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_streaming_calls_reuse_one_connection(self):
+        for _ in range(5):
+            result = ollama_humanize.humanize_with_ollama_streaming("text", ollama_url=self.url)
+            self.assertEqual(result, "Hello world")
+
+        self.assertEqual(len(_StreamingHandler.client_ports), 5)
+        self.assertEqual(len(set(_StreamingHandler.client_ports)), 1)
+
+
+class _SlowOrFlakyHandler(BaseHTTPRequestHandler):
+    """Answers 503 for the first `failures` POSTs, then sleeps `delay` seconds before a 200"""
+    protocol_version = "HTTP/1.1"
+    failures = 0
+    delay = 0.0
+    posts = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        cls = type(self)
+        cls.posts += 1
+        status = 503 if cls.posts <= cls.failures else 200
+        if status == 200:
+            time.sleep(cls.delay)
+        body = b'{"message": {"role": "assistant", "content": "ok"}, "done": true}'
+        try:
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up on a slow reply
+            pass
+
+
+class SessionRetryTest(unittest.TestCase):
+
+    def setUp(self):
+        _SlowOrFlakyHandler.posts = 0
+        _SlowOrFlakyHandler.failures = 0
+        _SlowOrFlakyHandler.delay = 0.0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _SlowOrFlakyHandler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api/chat"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.session = requests.Session()
+        self.session.mount("http://", ollama_humanize._make_adapter())
+
+    def tearDown(self):
+        self.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_read_timeout_is_not_retried(self):
+        _SlowOrFlakyHandler.delay = 0.5
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            self.session.post(self.url, data=b"{}", timeout=0.2)
+        self.assertEqual(_SlowOrFlakyHandler.posts, 1)
+
+    def test_gateway_errors_are_retried(self):
+        _SlowOrFlakyHandler.failures = 2
+        response = self.session.post(self.url, data=b"{}", timeout=5)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(_SlowOrFlakyHandler.posts, 3)
+
+
+def _chat_line(content, done=False, ensure_ascii=True):
+    """One compact chat stream line, laid out the way Ollama writes it"""
+    line = {"model": "m", "created_at": "2024-01-01T00:00:00Z",
+            "message": {"role": "assistant", "content": content}, "done": done}
+    return json.dumps(line, separators=(",", ":"), ensure_ascii=ensure_ascii).encode("utf-8")
+
+
+class ExtractStreamChunkTest(unittest.TestCase):
+    """The byte scanner must agree with json.loads on every line it accepts"""
+
+    CHAT_KEY = b'"content":"'
+    GENERATE_KEY = b'"response":"'
+
+    def assert_matches_json(self, line, content_key=CHAT_KEY):
+        result = ollama_humanize._extract_stream_chunk(line, content_key)
+        self.assertIsNotNone(result, line)
+        parsed = json.loads(line)
+        if content_key == self.CHAT_KEY:
+            expected = parsed["message"]["content"]
+        else:
+            expected = parsed["response"]
+        self.assertEqual(result, (expected, parsed["done"]), line)
+
+    def test_plain_text(self):
+        self.assert_matches_json(_chat_line("Hello there, "))
+
+    def test_escaped_quotes(self):
+        self.assert_matches_json(_chat_line('She said "hi" and "bye"'))
+
+    def test_trailing_backslash(self):
+        self.assert_matches_json(_chat_line("ends with \\"))
+        self.assert_matches_json(_chat_line("\\"))
+        self.assert_matches_json(_chat_line('backslash then quote \\"'))
+
+    def test_control_escapes(self):
+        self.assert_matches_json(_chat_line("line\nbreak\ttab\r"))
+
+    def test_unicode_escapes_and_surrogate_pairs(self):
+        self.assert_matches_json(_chat_line("caf\u00e9 \u2713 \U0001F600", ensure_ascii=True))
+
+    def test_raw_non_ascii(self):
+        self.assert_matches_json(_chat_line("caf\u00e9 \u2713 \U0001F600", ensure_ascii=False))
+
+    def test_empty_content(self):
+        self.assert_matches_json(_chat_line(""))
+        self.assert_matches_json(_chat_line("", done=True))
+
+    def test_done_flag(self):
+        self.assert_matches_json(_chat_line("last", done=True))
+        # Text that looks like the done flag doesn't set it
+        self.assert_matches_json(_chat_line('"done":true', done=False))
+
+    def test_generate_format(self):
+        for done in (False, True):
+            line = json.dumps({"model": "m", "response": 'a "b" \\', "done": done},
+                              separators=(",", ":")).encode("utf-8")
+            self.assert_matches_json(line, self.GENERATE_KEY)
+
+    def test_lines_without_the_key_need_a_full_parse(self):
+        for line in (b'{"error":"model not found"}', b'{"done":true}', _chat_line("x")):
+            self.assertIsNone(ollama_humanize._extract_stream_chunk(line, self.GENERATE_KEY))
+        # Default separators put a space after the colon, which the scanner doesn't accept
+        spaced = json.dumps({"message": {"content": "x"}, "done": False}).encode("utf-8")
+        self.assertIsNone(ollama_humanize._extract_stream_chunk(spaced, self.CHAT_KEY))
+
+    def test_random_strings(self):
+        rng = random.Random(0)
+        alphabet = 'ab "\\/\n\t\u00e9\u2713\U0001F600\x00\x1f'
+        for _ in range(2000):
+            content = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+            self.assert_matches_json(_chat_line(content, rng.random() < 0.5, rng.random() < 0.5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,25 @@
+import itertools
+import unittest
+
+from streamlit_app import calculate_humanness_score
+
+
+def _text_with_sentence_lengths(lengths):
+    """Build text whose sentences have the given word counts, with no repeated words"""
+    words = (f"w{i}" for i in itertools.count())
+    return ' '.join(' '.join(next(words) for _ in range(n)) + '.' for n in lengths)
+
+
+class HumannessScoreTest(unittest.TestCase):
+
+    def test_variance_exactly_at_threshold_is_not_above_it(self):
+        # The population variance of these lengths is exactly 10, which floating-point
+        # reductions can overshoot; only the "> 5" bonus of 10 points applies
+        text = _text_with_sentence_lengths([11, 5, 6, 5, 1, 5, 2, 10, 3])
+        score, metrics = calculate_humanness_score(text)
+        self.assertEqual(metrics['sentence_variance'], 10.0)
+        self.assertEqual(score, 60)
+
+
+if __name__ == "__main__":
+    unittest.main()